@@ -4,9 +4,17 @@ import pandas as pd
 from datetime import datetime
 from dotenv import load_dotenv
 import os
+import sys
 import logging
 
-from utils import save_data_to_json, save_dataframe_to_csv, save_campaigns_historical_data
+# Permite importar o pacote `include` ao rodar o script de dentro de `code/`
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from include.extract import GraphAPI  # Mesma classe usada pela DAG (sessão HTTP compartilhada)
+from include.extract_async import AsyncGraphAPI
+from include.metrics import PipelineMetrics
+from utils import (save_pages_to_ndjson, save_dataframe_to_parquet, save_campaigns_historical_data_async,
+                   save_campaigns_historical_data_columnar)
 
 # Carrega as variáveis de ambiente do arquivo .env
 load_dotenv()
@@ -25,192 +33,61 @@ logging.basicConfig(
     handlers=[
         logging.FileHandler(log_file),  # Salva logs em um arquivo
         logging.StreamHandler()  # Exibe logs no console
-    ]
+    ],
+    force=True  # Substitui a configuração feita ao importar o `include`
 )
 
 logger = logging.getLogger(__name__)
 
-class GraphAPI:
-    def __init__(self, fb_api):
-        self.base_url = 'https://graph.facebook.com/v22.0/'
-        self.api_fields = ['spend', 'cpc', 'cpm', 'objective', 'adset_name',
-                           'adset_id', 'clicks', 'campaign_name', 'campaign_id',
-                           'conversions', 'frequency', 'conversion_values',
-                           'ad_name', 'ad_id']
-        self.token = '&access_token=' + fb_api
-
-
-    def get_insights(self, ad_acc, level='campaign'):
-        """
-        Coleta dados de insights de uma conta de anúncio do Facebook.
-
-        Args:
-            ad_acc (str): ID da conta de anúncio.
-            level (str): Nível de agregação dos dados (padrão: 'campaign').
-
-        Returns:
-            dict: Dados de insights no formato JSON.
-        """
-        url = self.base_url + 'act_' + str(ad_acc)
-        url += '/insights?level=' + level
-        url += '&fields=' + ','.join(self.api_fields)
-
-        try:
-            response = requests.get(url + self.token)
-            response.raise_for_status()  # Levanta uma exceção para códigos de status 4xx/5xx
-            data = response.json()
-            logger.info("Dados de insights coletados com sucesso.")
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Erro na requisição: {e}")
-            return None
-        except json.JSONDecodeError as e:
-            logger.error(f"Erro ao decodificar JSON: {e}")
-            return None
-
-        # Processamento dos dados
-        for i in data.get('data', []):
-            if 'conversions' in i:
-                i['conversion'] = float(i['conversions'][0]['value'])
-
-        return data
-
-
-
-    def get_campaigns_status(self, ad_acc):
-        """
-        Coleta informações sobre o status das campanhas de uma conta de anúncio do Facebook.
-        Não é possível pegar o status da campanha pela função anterior, precisou dessa adicional
-
-        Args:
-            ad_acc (str): ID da conta de anúncio.
-
-        Returns:
-            dict: Dados de status das campanhas no formato JSON.
-                Retorna None em caso de erro.
-        """
-        url = self.base_url + 'act_' + str(ad_acc)
-        url += '/campaigns?fields=name,status,adsets{name, id}'
-
-        try:
-            # Faz a requisição com timeout de 10 segundos
-            response = requests.get(url + self.token, timeout=10)
-            response.raise_for_status()  # Levanta exceção para códigos de status 4xx/5xx
-            data = response.json()
-            logger.info("Dados de status das campanhas coletados com sucesso.")
-        except requests.exceptions.Timeout:
-            logger.error("A requisição excedeu o tempo limite.")
-            return None
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Erro na requisição: {e}")
-            return None
-        except json.JSONDecodeError as e:
-            logger.error(f"Erro ao decodificar JSON: {e}")
-            return None
-
-        return data
-
-
-
-    def get_adset_status(self, ad_acc):
-        """
-        Coleta informações sobre o status dos conjuntos de anúncios (adsets) de uma conta de anúncio do Facebook.
-
-        Args:
-            ad_acc (str): ID da conta de anúncio.
-
-        Returns:
-            dict: Dados de status dos conjuntos de anúncios no formato JSON.
-                Retorna None em caso de erro.
-        """  
-        
-        url = self.base_url + 'act_' + str(ad_acc)
-        url += '/adsets?fields=name,status,id'
-        
-        try:
-            # Faz a requisição com timeout de 10 segundos
-            response = requests.get(url + self.token, timeout=10)
-            response.raise_for_status()  # Levanta exceção para códigos de status 4xx/5xx
-            data = response.json()
-            logger.info("Dados de status dos conjuntos de anúncios coletados com sucesso.")
-        except requests.exceptions.Timeout:
-            logger.error("A requisição excedeu o tempo limite.")
-            return None
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Erro na requisição: {e}")
-            return None
-        except json.JSONDecodeError as e:
-            logger.error(f"Erro ao decodificar JSON: {e}")
-            return None
-
-        return data
-    
-
-    def get_data_over_time(self, campaign):
-        """
-        Coleta dados históricos de uma campanha ao longo do tempo.
-
-        Args:
-            campaign (str): ID da campanha.
-
-        Returns:
-            dict: Dados históricos da campanha no formato JSON.
-                Retorna None em caso de erro.
-        """
-        url = self.base_url + str(campaign)
-        url += '/insights?fields=' + ','.join(self.api_fields)
-        url += '&date_preset=last_30d&time_increment=1'
-
-        try:
-            # Faz a requisição com timeout de 10 segundos
-            response = requests.get(url + self.token, timeout=10)
-            response.raise_for_status()  # Levanta exceção para códigos de status 4xx/5xx
-            data = response.json()
-            logger.info(f"Dados históricos da campanha {campaign} coletados com sucesso.")
-        except requests.exceptions.Timeout:
-            logger.error("A requisição excedeu o tempo limite.")
-            return None
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Erro na requisição: {e}")
-            return None
-        except json.JSONDecodeError as e:
-            logger.error(f"Erro ao decodificar JSON: {e}")
-            return None
-
-        # Processamento dos dados
-        for i in data.get('data', []):
-            if 'conversions' in i:
-                i['conversion'] = float(i['conversions'][0]['value'])
-
-        return data
-
 
 if __name__ == '__main__':
     fb_api = os.getenv('AD_ACC_TOKEN')
     ad_acc = os.getenv('AD_ACC_ID')
    
-    self = GraphAPI(fb_api)
+    # Métricas de todas as etapas da execução (requisições, páginas, linhas, gravação)
+    metrics = PipelineMetrics()
+    self = GraphAPI(fb_api, metrics=metrics)
+
+    # Coleta o status das campanhas, gravando cada página assim que chega
+    campaign_ids = []
+
+    def track_active_campaigns(pages):
+        for page in pages:
+            campaign_ids.extend(campaign['id'] for campaign in page if campaign['status'] == 'ACTIVE')
+            yield page
 
-    # Coleta o status das campanhas
-    campaign_status = self.get_campaigns_status(ad_acc)
-    if campaign_status:
-        save_data_to_json(campaign_status, 'campaign_status')
+    if save_pages_to_ndjson(track_active_campaigns(self.iter_campaigns_status(ad_acc)), 'campaign_status',
+                            metrics=metrics):
         logger.info("Dados de status das campanhas salvos com sucesso.")
     else:
         logger.error("Falha ao coletar dados de status das campanhas.")
 
      # Coleta o status dos conjuntos de anúncios
-    adset_status = self.get_adset_status(ad_acc)
-    if adset_status:
-        save_data_to_json(adset_status, 'adset_status')
+    if save_pages_to_ndjson(self.iter_adset_status(ad_acc), 'adset_status', metrics=metrics):
         logger.info("Dados de status dos conjuntos de anúncios salvos com sucesso.")
     else:
         logger.error("Falha ao coletar dados de status dos conjuntos de anúncios.")
 
-    # Coleta dados históricos das campanhas ativas
-    campaign_ids = [campaign['id'] for campaign in campaign_status['data'] if campaign['status'] == 'ACTIVE']
-    df_campaigns = save_campaigns_historical_data(self, campaign_ids)
+    # Coleta dados históricos das campanhas ativas: em paralelo ou, com META_FAST_DECODE=1,
+    # em lote com as páginas decodificadas direto em colunas tipadas
+    if os.getenv('META_FAST_DECODE') == '1':
+        df_campaigns = save_campaigns_historical_data_columnar(self, campaign_ids, ad_acc)
+    else:
+        df_campaigns = save_campaigns_historical_data_async(AsyncGraphAPI(fb_api, metrics=metrics), campaign_ids,
+                                                            ad_acc)
     if df_campaigns is not None:
-        save_dataframe_to_csv(df_campaigns, 'campaigns_historical_data')
+        # Substitui as linhas (campanha + dia) recoletadas, sem duplicar dias já salvos; campanhas
+        # que ficaram de fora desta coleta (falha ou lista parcial) mantêm as linhas gravadas
+        save_dataframe_to_parquet(df_campaigns, 'campaigns_historical_data', ad_acc, mode='merge',
+                                  metrics=metrics)
         logger.info("Dados históricos das campanhas salvos com sucesso.")
     else:
-        logger.error("Falha ao coletar dados históricos das campanhas.")
\ No newline at end of file
+        logger.error("Falha ao coletar dados históricos das campanhas.")
+
+    # Fecha as conexões do pool HTTP
+    self.close()
+
+    # Métricas da execução no formato do Prometheus, ao lado do arquivo de log
+    with open(log_file.replace('.log', '.prom'), 'w', encoding='utf-8') as metrics_file:
+        metrics_file.write(metrics.to_prometheus())
+    logger.info(f"Métricas da execução: {metrics.summary()['counters']}")
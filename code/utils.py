@@ -1,8 +1,19 @@
 import pandas as pd
 from datetime import datetime
+import asyncio
 import os
+import sys
 import json
 
+# Permite importar o pacote `include` ao rodar os scripts de dentro de `code/`
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from include.columnar import concat_pages, page_columns
+from include.fields import fields_for
+from include.metrics import PipelineMetrics
+from include.sink import write_parquet
+from include.snapshot import NDJSONSnapshotWriter, snapshot_path
+
 
 
 def save_data_to_json(data_in_dict, dataset_name):
@@ -23,6 +34,28 @@ def save_data_to_json(data_in_dict, dataset_name):
 
 
 
+def save_pages_to_ndjson(pages, dataset_name, compression='gzip', metrics=None):
+    # Grava cada página assim que chega (NDJSON), sem montar a lista inteira em memória
+    metrics = metrics if metrics is not None else PipelineMetrics()
+    try:
+        # Gerar a data e hora atuais no formato dd-mm-yyyy hh-mm
+        current_time = datetime.now().strftime('%d-%m-%Y %Hh%M')
+
+        file_path = snapshot_path("output_ndjson_files", dataset_name, current_time, compression)
+        with NDJSONSnapshotWriter(file_path, compression=compression) as writer:
+            for page in pages:
+                with metrics.timer('stage_seconds', stage='write_ndjson'):
+                    writer.write_page(page)
+        metrics.incr('rows_loaded_total', writer.rows, table=dataset_name)
+        print(f"Dados salvos com sucesso em '{file_path}'")
+        return True
+
+    except Exception as e:
+        print(f"Não foi possível salvar {dataset_name}: {e}")
+        return False
+
+
+
 def save_dataframe_to_csv(dataframe, dataset_name):
     try:
         # Gerar a data e hora atuais no formato dd-mm-yyyy hh-mm
@@ -39,26 +72,91 @@ def save_dataframe_to_csv(dataframe, dataset_name):
 
 
 
-def save_campaigns_historical_data(self, campaign_ids):
+def save_dataframe_to_parquet(dataframe, dataset_name, account_id, mode='append', metrics=None):
+    # Dataset Parquet particionado por conta e data (substitui os CSVs com data no nome)
+    metrics = metrics if metrics is not None else PipelineMetrics()
     try:
-        df_final = pd.DataFrame()
-        
-        for campaign in campaign_ids:
-            campaign_data = self.get_data_over_time(campaign)['data']
-
-            # Converter strings numéricas para float/int
-            for entry in campaign_data:
-                entry['spend'] = float(entry['spend'])
-                entry['cpc'] = float(entry['cpc'])
-                entry['cpm'] = float(entry['cpm'])
-                entry['clicks'] = int(entry['clicks'])
-                entry['frequency'] = float(entry['frequency'])
-
-            # Criar um DataFrame (estrutura tabular)
-            df_campaign = pd.DataFrame(campaign_data)
-            df_final = pd.concat([df_final, df_campaign], ignore_index=True)
-            
-        return df_final
+        root_dir = os.path.join("output_parquet_files", dataset_name)
+        with metrics.timer('stage_seconds', stage='write_parquet'):
+            write_parquet(dataframe, root_dir, account_id, mode=mode)
+        metrics.incr('rows_loaded_total', len(dataframe), table=dataset_name)
+        print(f"Dados salvos com sucesso em '{root_dir}'")
+
+    except Exception as e:
+        print(f"Não foi possível salvar {dataset_name}: {e}")
+
+
+
+# Tipos das colunas numéricas e categóricas dos dados históricos
+HISTORICAL_DTYPES = {
+    'spend': 'float32',
+    'cpc': 'float32',
+    'cpm': 'float32',
+    'clicks': 'int32',
+    'frequency': 'float32',
+    'campaign_name': 'category',
+    'objective': 'category',
+}
+
+
+
+def campaigns_data_to_dataframe(campaigns_data):
+    # Junta as linhas de todas as campanhas e cria o DataFrame uma única vez
+    records = [entry for campaign_data in campaigns_data for entry in campaign_data]
+    df_final = pd.DataFrame.from_records(records)
+
+    # Converter strings numéricas para float/int de uma vez por coluna
+    for column, dtype in HISTORICAL_DTYPES.items():
+        if column not in df_final:
+            continue
+        if dtype == 'category':
+            df_final[column] = df_final[column].astype('category')
+        else:
+            df_final[column] = pd.to_numeric(df_final[column]).astype(dtype)
+
+    return df_final
+
+
+
+def collected_results(results, campaign_ids):
+    # Campanhas que falharam ficam com None nos resultados: são ignoradas e informadas
+    skipped = [campaign for campaign in campaign_ids if results.get(campaign) is None]
+    if skipped:
+        print(f"Dados históricos não coletados para {len(skipped)} campanhas: {', '.join(map(str, skipped))}")
+    return [results[campaign] for campaign in campaign_ids if results.get(campaign) is not None]
+
+
+
+def save_campaigns_historical_data(self, campaign_ids, ad_acc=None):
+    try:
+        # Agrupa as campanhas em requisições em lote (até 50 por requisição)
+        results = self.get_campaigns_data_over_time(campaign_ids, batch_size=50, ad_acc=ad_acc)
+        with self.metrics.timer('stage_seconds', stage='dataframe'):
+            return campaigns_data_to_dataframe(data['data'] for data in collected_results(results, campaign_ids))
      
+    except:
+        print("Não foi possível salvar os dados históricos das campanhas.")
+
+
+
+def save_campaigns_historical_data_columnar(self, campaign_ids, ad_acc=None):
+    # Caminho rápido: cada página vai dos bytes direto para colunas tipadas (pyarrow), sem dicts por linha
+    try:
+        results = self.get_campaigns_data_over_time(campaign_ids, batch_size=50, columnar=True, ad_acc=ad_acc)
+        with self.metrics.timer('stage_seconds', stage='dataframe'):
+            return concat_pages(collected_results(results, campaign_ids), page_columns(fields_for('campaign'))).to_pandas()
+
+    except:
+        print("Não foi possível salvar os dados históricos das campanhas.")
+
+
+
+def save_campaigns_historical_data_async(async_api, campaign_ids, ad_acc=None):
+    # Busca todas as campanhas em paralelo (AsyncGraphAPI), respeitando o limite de concorrência
+    try:
+        results = asyncio.run(async_api.get_campaigns_data_over_time(campaign_ids, ad_acc=ad_acc))
+        with async_api.metrics.timer('stage_seconds', stage='dataframe'):
+            return campaigns_data_to_dataframe(data['data'] for data in collected_results(results, campaign_ids))
+
     except:
         print("Não foi possível salvar os dados históricos das campanhas.")
\ No newline at end of file
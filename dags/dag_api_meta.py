@@ -1,36 +1,77 @@
 from airflow.decorators import dag, task
-from datetime import datetime
+from datetime import datetime, timedelta
+import logging
 import os
 
-from include.controller import CampaignController
-
+# O código de include/ (SQLAlchemy, requests, aiohttp, pydantic...) é importado dentro
+# das tasks: o scheduler reprocessa este arquivo a cada ciclo de parse.
 
 
 fb_api_token = os.getenv('AD_ACC_TOKEN')
 ad_acc_id = os.getenv('AD_ACC_ID')
 
+# Campanhas por task mapeada; cada task coleta as suas em paralelo, uma requisição por campanha
+chunk_size = int(os.getenv('META_CHUNK_SIZE', 50))
+# Pool que limita quantas tasks chamam a API ao mesmo tempo (ver airflow_settings.yaml)
+api_pool = os.getenv('META_API_POOL', 'meta_api')
+# Arquivo .prom lido pelo textfile collector do node_exporter (opcional)
+metrics_textfile = os.getenv('META_METRICS_TEXTFILE')
+
 
 @dag(
         dag_id="dados_api_meta",
         description="pipeline para capturar os dados da api meta",
         schedule_interval="* * * * *",
         start_date=datetime(2025,3,16),
-        catchup=False
+        catchup=False,
+        # Lotes com falha na coleta ou na carga são refeitos pelo Airflow
+        default_args={'retries': 2, 'retry_delay': timedelta(minutes=1)}
 )
 def dag_api_meta():
-    @task(task_id='coletar_dados_api')
-    def task_coletar_dados_api():
+    @task(task_id='listar_campanhas', pool=api_pool)
+    def task_listar_campanhas():
+        from include.controller import CampaignController
+
+        controller = CampaignController(fb_api_token, ad_acc_id)
+        # Partições do mês criadas aqui, uma vez, e não pelas tasks mapeadas em paralelo
+        controller.prepare_partitions()
+        return controller.get_active_campaign_chunks(chunk_size)
+
+    # Uma instância por lote de campanhas, distribuídas entre os workers
+    @task(task_id='coletar_e_salvar_dados', pool=api_pool)
+    def task_coletar_e_salvar_dados(campaign_ids):
+        from include.controller import CampaignController
+
         controller = CampaignController(fb_api_token, ad_acc_id)
-        controller.fetch_and_save_campaigns()
-        return 'hue'
+        # Uma falha na carga desfaz a transação e é propagada: a task falha e o
+        # Airflow aplica os retries, em vez de resumir_carga somar um relatório zerado
+        report = controller.fetch_and_save_campaigns_history(campaign_ids)
+        # O resumo das métricas vai junto no XCom, para a task final consolidar
+        return {'report': report, 'metrics': controller.metrics.summary()}
+
+    @task(task_id='resumir_carga')
+    def task_resumir_carga(results):
+        from include.metrics import merge_summaries, summary_to_prometheus
+
+        results = list(results)
+        total = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        for result in results:
+            for key in total:
+                total[key] += result['report'][key]
 
-    @task(task_id='salvar_dados_no_db')
-    def task_salvar_dados_no_db():
-        return 'aeho'
+        metrics = merge_summaries(result['metrics'] for result in results)
+        prometheus = summary_to_prometheus(metrics)
+        if metrics_textfile:
+            with open(metrics_textfile, 'w', encoding='utf-8') as f:
+                f.write(prometheus)
 
-    t1 = task_coletar_dados_api()
-    t2 = task_salvar_dados_no_db()
+        logger = logging.getLogger(__name__)
+        logger.info(f"Carga concluída: {total}")
+        logger.info(f"Métricas da execução:\n{prometheus}")
+        return {'report': total, 'metrics': metrics}
 
-    t1 >> t2
+    chunks = task_listar_campanhas()
+    reports = task_coletar_e_salvar_dados.expand(campaign_ids=chunks)
+    task_resumir_carga(reports)
 
-dag_api_meta()
\ No newline at end of file
+dag_api_meta()
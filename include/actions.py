@@ -0,0 +1,59 @@
+# Normalização das listas de ações da Graph API (conversions, conversion_values,
+# actions) em uma tabela longa: (campaign_id, date_start, metric, action_type, value).
+# Cada página é processada de uma vez com pandas, sem loop em Python por linha.
+import logging
+
+import pandas as pd
+
+# Configura o logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Campos de ações normalizados por padrão; `actions` é opcional (payload bem maior)
+ACTION_METRICS = ('conversions', 'conversion_values')
+
+# Colunas que identificam a linha campanha-dia de origem
+ACTION_KEY = ['campaign_id', 'date_start']
+
+ACTION_COLUMNS = ACTION_KEY + ['metric', 'action_type', 'value']
+
+
+def normalize_actions(rows, metrics=ACTION_METRICS):
+    """
+    Explode as listas de ações de uma página de insights em formato longo.
+
+    Exemplo: uma linha com `conversions=[{'action_type': 'purchase', 'value': '3'}]`
+    vira `(campaign_id, date_start, 'conversions', 'purchase', 3.0)`.
+
+    Args:
+        rows (list): Linhas (dicts) como vieram da API.
+        metrics (tuple): Campos de ações a normalizar.
+
+    Returns:
+        pd.DataFrame: Colunas `ACTION_COLUMNS`; `metric` e `action_type` como category,
+            `value` como float64 e `date_start` como datetime.date.
+    """
+    df = pd.DataFrame(rows, columns=ACTION_KEY + list(metrics))
+    long = (df.melt(id_vars=ACTION_KEY, value_vars=list(metrics), var_name='metric', value_name='entry')
+              .explode('entry')
+              .dropna(subset=['entry']))
+    if long.empty:
+        return pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in
+                             zip(ACTION_COLUMNS, ['object', 'object', 'category', 'category', 'float64'])})
+
+    entries = pd.DataFrame(long['entry'].tolist(), index=long.index).reindex(columns=['action_type', 'value'])
+    long = long[ACTION_KEY + ['metric']].assign(
+        action_type=entries['action_type'],
+        value=pd.to_numeric(entries['value'], errors='coerce'),
+    )
+
+    invalid = long['value'].isna() | long['action_type'].isna()
+    if invalid.any():
+        logger.warning(f"{int(invalid.sum())} ações sem tipo ou com valor não numérico foram descartadas.")
+        long = long[~invalid]
+
+    long = long.reset_index(drop=True)
+    long['date_start'] = pd.to_datetime(long['date_start']).dt.date
+    long['metric'] = long['metric'].astype('category')
+    long['action_type'] = long['action_type'].astype('category')
+    return long
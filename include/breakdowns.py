@@ -0,0 +1,50 @@
+# Linhas de insights com breakdowns (idade, gênero, posicionamento, região, hora...)
+# em formato compacto: cada dimensão vira uma coluna category do pandas (códigos
+# inteiros + dicionário de valores), no mesmo formato das tabelas do banco.
+import logging
+
+import pandas as pd
+
+from .fields import breakdowns_for
+
+# Configura o logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Métricas gravadas por combinação de dimensões
+BREAKDOWN_METRICS = ['spend', 'clicks', 'cpc', 'cpm', 'frequency']
+
+# Dimensões por linha de fato (colunas dimension_1_id / dimension_2_id)
+MAX_BREAKDOWNS = 2
+
+
+def encode_breakdowns(rows, breakdowns):
+    """
+    Converte uma página de insights com breakdowns em um DataFrame compacto.
+
+    Args:
+        rows (list): Linhas (dicts) como vieram da API.
+        breakdowns (list | str): Dimensões pedidas na consulta.
+
+    Returns:
+        pd.DataFrame: campaign_id e dimensões como category, date_start como
+            datetime.date, métricas numéricas (`BREAKDOWN_METRICS`).
+
+    Raises:
+        ValueError: Se forem pedidas mais de `MAX_BREAKDOWNS` dimensões.
+    """
+    dimensions = breakdowns_for(breakdowns)
+    if len(dimensions) > MAX_BREAKDOWNS:
+        raise ValueError(f"No máximo {MAX_BREAKDOWNS} dimensões por consulta: {dimensions}")
+
+    df = pd.DataFrame(rows, columns=['campaign_id', 'date_start'] + dimensions + BREAKDOWN_METRICS)
+    df = df.dropna(subset=['campaign_id', 'date_start', dimensions[0]])
+    df['date_start'] = pd.to_datetime(df['date_start']).dt.date
+    for column in ['campaign_id'] + dimensions:
+        df[column] = df[column].astype('category')
+
+    # A API devolve números como strings
+    df[BREAKDOWN_METRICS] = df[BREAKDOWN_METRICS].apply(pd.to_numeric, errors='coerce')
+    df['spend'] = df['spend'].fillna(0.0)
+    df['clicks'] = df['clicks'].fillna(0).astype('int64')
+    return df.reset_index(drop=True)
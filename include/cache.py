@@ -0,0 +1,165 @@
+# Cache de respostas da Graph API para metadados que mudam pouco (status de
+# campanhas e adsets, lista de contas): LRU em memória, armazenamento opcional
+# em disco, TTL por endpoint e revalidação por ETag (If-None-Match / 304).
+from collections import OrderedDict
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+# Configura o logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class CacheEntry:
+    def __init__(self, payload, etag=None, expires_at=0.0):
+        self.payload = payload
+        self.etag = etag
+        self.expires_at = expires_at
+
+    @property
+    def fresh(self):
+        return time.time() < self.expires_at
+
+
+class ResponseCache:
+    """
+    Cache de páginas da Graph API, chaveado por endpoint e URL completa
+    (conta, parâmetros e um hash do token).
+
+    Endpoints sem TTL configurado não são armazenados. Entradas vencidas com
+    ETag continuam guardadas para serem revalidadas com If-None-Match.
+    O GraphAPI grava as páginas sem o token nas URLs de paginação
+    (ver `GraphAPI._page_without_token`).
+    """
+    # TTL (segundos) de cada endpoint; os demais não usam cache
+    default_ttls = {
+        'campaigns': 300,
+        'adsets': 300,
+        'adaccounts': 3600,
+    }
+
+    def __init__(self, max_entries=256, directory=None, ttls=None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.ttls = {**self.default_ttls, **(ttls or {})}
+        self.stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'stores': 0}
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+
+    @classmethod
+    def from_env(cls):
+        """
+        Cria o cache usando GRAPH_CACHE_DIR (armazenamento em disco) e
+        GRAPH_CACHE_MAX_ENTRIES, se definidos.
+        """
+        return cls(max_entries=int(os.getenv('GRAPH_CACHE_MAX_ENTRIES', 256)),
+                   directory=os.getenv('GRAPH_CACHE_DIR') or None)
+
+
+    def enabled_for(self, endpoint):
+        return self.ttls.get(endpoint, 0) > 0
+
+
+    def _key(self, endpoint, url):
+        return hashlib.sha256(f'{endpoint} {url}'.encode('utf-8')).hexdigest()
+
+
+    def _disk_path(self, key):
+        return os.path.join(self.directory, key + '.json')
+
+
+    def get(self, endpoint, url):
+        """
+        Busca a entrada de uma URL (fresca ou vencida), primeiro na memória e depois no disco.
+
+        Returns:
+            CacheEntry: Entrada encontrada, ou None.
+        """
+        if not self.enabled_for(endpoint):
+            return None
+
+        key = self._key(endpoint, url)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+
+        if entry is None and self.directory:
+            entry = self._read_disk(key)
+            if entry is not None:
+                self._remember(key, entry)
+
+        with self._lock:
+            if entry is not None and entry.fresh:
+                self.stats['hits'] += 1
+            else:
+                self.stats['misses'] += 1
+        return entry
+
+
+    def put(self, endpoint, url, payload, etag=None):
+        """
+        Armazena a página de uma URL com o TTL do endpoint.
+        """
+        if not self.enabled_for(endpoint):
+            return
+        key = self._key(endpoint, url)
+        entry = CacheEntry(payload, etag, time.time() + self.ttls[endpoint])
+        self._remember(key, entry)
+        if self.directory:
+            self._write_disk(key, entry)
+        with self._lock:
+            self.stats['stores'] += 1
+
+
+    def revalidated(self, endpoint, url, entry):
+        """
+        Renova o TTL de uma entrada confirmada pela API (resposta 304).
+        """
+        with self._lock:
+            self.stats['revalidated'] += 1
+        self.put(endpoint, url, entry.payload, entry.etag)
+
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+
+    def _read_disk(self, key):
+        try:
+            with open(self._disk_path(key), encoding='utf-8') as f:
+                stored = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Entrada de cache inválida ({key}): {e}")
+            return None
+        return CacheEntry(stored['payload'], stored.get('etag'), stored.get('expires_at', 0.0))
+
+
+    def _write_disk(self, key, entry):
+        path = self._disk_path(key)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'payload': entry.payload, 'etag': entry.etag,
+                           'expires_at': entry.expires_at}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Não foi possível gravar o cache em disco: {e}")
@@ -0,0 +1,148 @@
+# Decodificação rápida das páginas de insights: o corpo da resposta (bytes) vai
+# direto para colunas Arrow tipadas pelo leitor JSON do pyarrow (C++), sem criar
+# um dict Python por linha nem percorrer as linhas de novo para converter números.
+import io
+import logging
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.json as pa_json
+
+from .fields import BREAKDOWNS, IMPLICIT_FIELDS
+
+# Configura o logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Texto com poucos valores distintos: vira dicionário (category no pandas)
+CATEGORY = pa.dictionary(pa.int32(), pa.string())
+# Listas de ações (conversions, conversion_values, actions), como a API devolve
+ACTIONS = pa.list_(pa.struct([('action_type', pa.string()), ('value', pa.string())]))
+
+# Tipo final de cada campo conhecido dos insights (mesmos tipos de HISTORICAL_DTYPES
+# e do Parquet). A API manda números e datas como texto; campos fora daqui ficam texto.
+INSIGHTS_TYPES = {
+    'spend': pa.float32(),
+    'cpc': pa.float32(),
+    'cpm': pa.float32(),
+    'clicks': pa.int32(),
+    'frequency': pa.float32(),
+    'objective': CATEGORY,
+    'campaign_name': CATEGORY,
+    'campaign_id': pa.string(),
+    'adset_name': CATEGORY,
+    'adset_id': pa.string(),
+    'ad_name': CATEGORY,
+    'ad_id': pa.string(),
+    'date_start': pa.date32(),
+    'date_stop': pa.date32(),
+    'conversions': ACTIONS,
+    'conversion_values': ACTIONS,
+    'actions': ACTIONS,
+    **{dimension: CATEGORY for dimension in BREAKDOWNS},
+}
+
+
+def page_columns(fields, breakdowns=None):
+    """
+    Colunas de uma página de insights: campos pedidos, dimensões de breakdown e
+    os campos que a API devolve sempre (date_start, date_stop).
+    """
+    columns = list(fields) + list(breakdowns or [])
+    return columns + sorted(IMPLICIT_FIELDS - set(columns))
+
+
+def page_schema(columns):
+    """
+    Schema Arrow do corpo de uma página (`data` e `paging.next`), com os campos
+    como chegam da API: texto, ou lista de ações.
+    """
+    row = pa.struct([(name, ACTIONS if INSIGHTS_TYPES.get(name) == ACTIONS else pa.string())
+                     for name in columns])
+    return pa.schema([('data', pa.list_(row)), ('paging', pa.struct([('next', pa.string())]))])
+
+
+def _cast(values, target):
+    if target == CATEGORY:
+        return pc.dictionary_encode(values)
+    if target == ACTIONS or values.type == target:
+        return values
+    return pc.cast(values, target)
+
+
+def _first_action_value(actions):
+    """
+    Valor (float) da primeira ação de cada linha; nulo quando a linha não tem ações.
+    Equivale à coluna `conversion` criada por `_process_conversions`.
+    """
+    first = pc.list_slice(actions, 0, 1)
+    values = np.full(len(actions), np.nan, dtype='float32')
+    values[pc.list_parent_indices(first).to_numpy()] = pc.cast(
+        pc.list_flatten(first).field('value'), pa.float32()).to_numpy(zero_copy_only=False)
+    return pa.array(values, from_pandas=True)
+
+
+def decode_pages(bodies, columns):
+    """
+    Decodifica os corpos de várias páginas de insights em uma única chamada ao
+    leitor JSON (um corpo por linha), com uma única conversão de tipos por coluna.
+
+    Args:
+        bodies (list): Corpos JSON das respostas (bytes, ex: `response.content`).
+            Cada corpo deve estar em uma linha só, como a Graph API devolve.
+        columns (list): Campos das páginas; ver `page_columns`. Campos ausentes na
+            resposta viram colunas nulas e campos não pedidos são ignorados.
+
+    Returns:
+        tuple: (pa.Table com as linhas de todas as páginas, na ordem dos corpos;
+            lista com (quantidade de linhas, URL da próxima página ou None) de cada página).
+            Com `conversions`, a tabela inclui também a coluna `conversion` (float).
+
+    Raises:
+        pyarrow.ArrowInvalid: Se algum corpo não for JSON válido ou algum valor não
+            puder ser convertido para o tipo da coluna.
+    """
+    data = b'\n'.join(bodies)
+    parse_options = pa_json.ParseOptions(explicit_schema=page_schema(columns),
+                                         unexpected_field_behavior='ignore')
+    # Cada página ocupa uma linha inteira, que precisa caber em um bloco do leitor
+    read_options = pa_json.ReadOptions(block_size=max(len(data), 1 << 20))
+    pages = pa_json.read_json(io.BytesIO(data), read_options=read_options, parse_options=parse_options)
+    if pages.num_rows != len(bodies):
+        raise pa.ArrowInvalid(f"Esperadas {len(bodies)} páginas, decodificadas {pages.num_rows}.")
+
+    data = pages.column('data').combine_chunks()
+    rows = pc.list_flatten(data)
+    arrays = {name: _cast(rows.field(name), INSIGHTS_TYPES.get(name, pa.string()))
+              for name in columns}
+    if 'conversions' in arrays:
+        arrays['conversion'] = _first_action_value(arrays['conversions'])
+
+    counts = pc.fill_null(pc.list_value_length(data), 0).to_pylist()
+    next_urls = pages.column('paging').combine_chunks().field('next').to_pylist()
+    return pa.table(arrays), list(zip(counts, next_urls))
+
+
+def decode_page(body, columns):
+    """
+    Decodifica o corpo de uma página de insights direto em colunas tipadas.
+
+    Returns:
+        tuple: (pa.Table com uma coluna por campo, URL da próxima página ou None).
+
+    Raises:
+        pyarrow.ArrowInvalid: Ver `decode_pages`.
+    """
+    table, [(_, next_url)] = decode_pages([body], columns)
+    return table, next_url
+
+
+def concat_pages(tables, columns):
+    """
+    Junta as páginas decodificadas em uma tabela só, unificando os dicionários
+    das colunas categóricas. Sem páginas, devolve uma tabela vazia com as colunas.
+    """
+    if not tables:
+        return decode_page(b'{"data":[]}', columns)[0]
+    return pa.concat_tables(tables).unify_dictionaries().combine_chunks()
@@ -1,65 +1,311 @@
-from .models import Campaign, Ads  # Importe seus Models
-from .schema import CampaignResponse  # Importe seus Schemas
+from .models import CAMPAIGN_PARTITIONED, Campaign  # Importe seus Models
+from .schema import CampaignCreate, CampaignResponse  # Importe seus Schemas
 from .extract import GraphAPI  # Importe a classe de extração de dados
-from .db import SessionLocal  # Importe a sessão do banco de dados
-from datetime import date
+from .extract_async import AsyncGraphAPI  # Versão assíncrona, para coletas em paralelo
+from .db import session_scope  # Unidade de trabalho com a sessão do banco de dados
+from .watermark import LOOKBACK_DAYS, RESTATEMENT_DAYS, advance_watermarks, extraction_range, get_time_ranges
+from .loader import upsert_campaign_actions, upsert_campaign_breakdowns, upsert_campaigns
+from .partitions import ensure_partitions
+from .breakdowns import BREAKDOWN_METRICS, encode_breakdowns
+from .actions import ACTION_METRICS, normalize_actions
+from .fields import consumer_field_names
+from .validation import validate_rows, write_quarantine
+from .metrics import PipelineMetrics
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+import asyncio
 import logging
+import requests
+import time
 
 # Configura o logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class CampaignController:
-    def __init__(self, fb_api_token, ad_acc_id):
-        self.fb_api = GraphAPI(fb_api_token)
+    def __init__(self, fb_api_token, ad_acc_id, max_concurrency=10, action_metrics=ACTION_METRICS,
+                 metrics=None):
+        # Métricas da execução, compartilhadas pelos clientes da API e pelas etapas de carga
+        self.metrics = metrics if metrics is not None else PipelineMetrics()
+        self.fb_api = GraphAPI(fb_api_token, metrics=self.metrics)
+        self.async_fb_api = AsyncGraphAPI(fb_api_token, max_concurrency=max_concurrency,
+                                          metrics=self.metrics)
         self.ad_acc_id = ad_acc_id
+        # Listas de ações normalizadas na tabela campaign_action (ex: + 'actions')
+        self.action_metrics = tuple(action_metrics)
+
+    @classmethod
+    def ingest_accounts(cls, fb_api_token, ad_acc_ids=None, business=None, max_workers=4,
+                        max_concurrency=10):
+        """
+        Coleta e salva os dados de várias contas de anúncio ao mesmo tempo.
+
+        Cada conta roda em uma thread do pool, com seus próprios clientes e sessão
+        do banco; a falha de uma conta não interrompe as demais. Todas as contas
+        compartilham o mesmo controle de rate limit, pois o limite da API é por token.
+
+        Args:
+            fb_api_token (str): Token de acesso da API.
+            ad_acc_ids (list): IDs das contas (padrão: descobertas via me/adaccounts).
+            business (str): ID do Business Manager usado na descoberta das contas.
+            max_workers (int): Contas processadas em paralelo.
+            max_concurrency (int): Requisições simultâneas dentro de cada conta.
+
+        Returns:
+            dict: Resultado de cada conta ({ad_acc_id: {'status', 'report', 'error', 'seconds',
+                'metrics'}}), com o resumo de `PipelineMetrics` de cada conta.
+
+        Raises:
+            RuntimeError: Se as contas não foram informadas e a descoberta falhar.
+        """
+        if ad_acc_ids is None:
+            with GraphAPI(fb_api_token) as fb_api:
+                ad_acc_ids = fb_api.get_ad_accounts(business)
+            # None é falha na descoberta, e não um token sem contas
+            if ad_acc_ids is None:
+                raise RuntimeError("Não foi possível descobrir as contas de anúncio do token.")
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(cls._ingest_account, fb_api_token, ad_acc_id, max_concurrency): ad_acc_id
+                       for ad_acc_id in ad_acc_ids}
+            # Cada conta é registrada assim que termina, sem esperar pelas mais lentas
+            for future in as_completed(futures):
+                ad_acc_id = futures[future]
+                results[ad_acc_id] = future.result()
+                logger.info(f"Conta {ad_acc_id}: {results[ad_acc_id]['status']} "
+                            f"em {results[ad_acc_id]['seconds']:.1f}s.")
+
+        failed = [ad_acc_id for ad_acc_id, result in results.items() if result['status'] == 'error']
+        if failed:
+            logger.error(f"Falha na ingestão de {len(failed)} de {len(results)} contas: {failed}")
+        return results
+
+    @classmethod
+    def _ingest_account(cls, fb_api_token, ad_acc_id, max_concurrency):
+        """
+        Ingestão completa de uma conta, isolando erros e medindo o tempo gasto.
+        """
+        start = time.perf_counter()
+        result = {'status': 'ok', 'report': None, 'error': None}
+        metrics = PipelineMetrics()
+        controller = None
+        try:
+            # Erros na criação dos clientes (ex: diretório do cache) também ficam nesta conta
+            controller = cls(fb_api_token, ad_acc_id, max_concurrency=max_concurrency, metrics=metrics)
+            report = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+            with session_scope() as db:
+                for campaign_ids in controller.get_active_campaign_chunks():
+                    chunk_report = controller.fetch_and_save_campaigns_history(campaign_ids, db)
+                    for key in report:
+                        report[key] += chunk_report[key]
+            result['report'] = report
+        except Exception as e:
+            logger.error(f"Erro na ingestão da conta {ad_acc_id}: {e}")
+            result.update(status='error', error=str(e))
+        finally:
+            if controller is not None:
+                controller.fb_api.close()
+        result['seconds'] = time.perf_counter() - start
+        result['metrics'] = metrics.summary()
+        return result
+
+    def get_active_campaign_chunks(self, chunk_size=50):
+        """
+        Lista as campanhas ativas da conta, agrupadas em lotes de IDs. Cada lote
+        vira uma task mapeada na DAG (coleta e carga em paralelo entre workers).
+
+        Args:
+            chunk_size (int): Quantidade de campanhas por lote.
+
+        Returns:
+            list: Lotes de IDs de campanhas ativas.
+
+        Raises:
+            requests.exceptions.RequestException: Se a listagem das campanhas falhar.
+        """
+        campaign_ids = [c['id']
+                        for page in self.fb_api.iter_campaigns_status(self.ad_acc_id)
+                        for c in page if c['status'] == 'ACTIVE']
+        logger.info(f"{len(campaign_ids)} campanhas ativas na conta {self.ad_acc_id}.")
+        return [campaign_ids[i:i + chunk_size] for i in range(0, len(campaign_ids), chunk_size)]
+
+    def prepare_partitions(self, today=None):
+        """
+        Cria as partições mensais que a próxima carga pode usar (toda a janela de
+        LOOKBACK_DAYS até hoje), em uma transação própria. Deve rodar antes das
+        tasks paralelas, para que elas não disputem a criação da mesma partição.
+        Sem CAMPAIGN_PARTITIONED, não faz nada.
+
+        Returns:
+            list: Nomes das partições da janela.
+        """
+        if not CAMPAIGN_PARTITIONED:
+            return []
+        today = today or date.today()
+        with session_scope() as db:
+            return ensure_partitions(db, today - timedelta(days=LOOKBACK_DAYS), today)
 
     def fetch_and_save_campaigns(self):
         """
         Coleta dados de campanhas da API do Facebook e salva no banco de dados.
+        As campanhas ativas de cada página são carregadas assim que a página chega.
+
+        Returns:
+            dict: Quantidade de linhas inseridas, atualizadas e inalteradas.
         """
-        db = SessionLocal()
+        report = {'inserted': 0, 'updated': 0, 'unchanged': 0}
         try:
-            # Coleta dados de campanhas
-            campaign_status = self.fb_api.get_campaigns_status(self.ad_acc_id)
-            if not campaign_status:
-                logger.error("Falha ao coletar dados de status das campanhas.")
-                return
-
-            # Processa e salva cada campanha
-            for campaign_data in campaign_status.get('data', []):
-                if campaign_data['status'] == 'ACTIVE':
-                    # Cria um objeto Campaign a partir dos dados da API
-                    campaign = Campaign(
-                        campaign_id=campaign_data['id'],
-                        campaign_name=campaign_data['name'],
-                        status=campaign_data['status'],
-                        date_start=date.today(),  # Exemplo de data
-                        date_stop=date.today()    # Exemplo de data
-                    )
-                    db.add(campaign)
-                    logger.info(f"Campanha {campaign_data['name']} salva com sucesso.")
-
-            db.commit()
+            # Uma única sessão para toda a task; cada página é confirmada ao ser carregada
+            with session_scope() as db:
+                # Coleta as campanhas página por página, processando cada uma assim que chega
+                for page in self.fb_api.iter_campaigns_status(self.ad_acc_id):
+                    campaign_ids = [c['id'] for c in page if c['status'] == 'ACTIVE']
+                    if campaign_ids:
+                        page_report = self.fetch_and_save_campaigns_history(campaign_ids, db)
+                        for key in report:
+                            report[key] += page_report[key]
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Falha ao coletar dados de status das campanhas: {e}")
+        return report
+
+    def fetch_campaigns_data_over_time(self, campaign_ids, time_ranges=None):
+        """
+        Coleta em paralelo os dados históricos das campanhas informadas.
+
+        Args:
+            campaign_ids (list): IDs das campanhas.
+            time_ranges (dict): Datas (início, fim) de cada campanha (padrão: últimos 30 dias).
+
+        Returns:
+            dict: Dados históricos de cada campanha ({campaign_id: dados}).
+                Campanhas com erro ficam com valor None.
+        """
+        # Pede à API apenas os campos que são persistidos (campanha + listas de ações)
+        fields = consumer_field_names(CampaignCreate) + list(self.action_metrics)
+        return asyncio.run(self.async_fb_api.get_campaigns_data_over_time(campaign_ids,
+                                                                          fields=fields,
+                                                                          time_ranges=time_ranges,
+                                                                          ad_acc=self.ad_acc_id))
+
+    def fetch_and_save_campaigns_history(self, campaign_ids, db=None):
+        """
+        Coleta de forma incremental os dados diários das campanhas e salva no banco.
+        Cada campanha busca apenas os dias após o último já carregado (watermark),
+        mais a janela de reprocessamento. A carga é um upsert em lote por
+        (campaign_id, date_start), então reexecuções não duplicam linhas. As listas
+        de ações (conversions, conversion_values...) vão para a tabela campaign_action.
+
+        Args:
+            campaign_ids (list): IDs das campanhas.
+            db (Session): Sessão da unidade de trabalho atual (padrão: abre uma nova).
+
+        Returns:
+            dict: Quantidade de linhas inseridas, atualizadas e inalteradas.
+
+        Raises:
+            Exception: Se a carga falhar; a transação é desfeita e o erro propagado,
+                para que a conta (ou a task) seja registrada como falha.
+        """
+        if db is None:
+            with session_scope() as db:
+                return self.fetch_and_save_campaigns_history(campaign_ids, db)
+
+        try:
+            time_ranges = get_time_ranges(db, self.ad_acc_id, campaign_ids)
+            with self.metrics.timer('stage_seconds', stage='extract'):
+                results = self.fetch_campaigns_data_over_time(campaign_ids, time_ranges)
+
+            raw_rows = []
+            for campaign, data in results.items():
+                if data is None:
+                    logger.error(f"Falha ao coletar dados históricos da campanha {campaign}.")
+                    continue
+                raw_rows.extend(data['data'])
+
+            # Valida todas as linhas de uma vez; as inválidas vão para a quarentena
+            with self.metrics.timer('stage_seconds', stage='validate'):
+                rows, rejects = validate_rows(raw_rows)
+            self.metrics.incr('rows_validated_total', len(rows))
+            self.metrics.incr('rows_rejected_total', len(rejects))
+            write_quarantine(rejects, f'campaign {self.ad_acc_id}')
+
+            # O watermark avança só até o último dia que a API devolveu e passou na
+            # validação; dias ainda não consolidados voltam a ser pedidos na próxima carga
+            loaded = {}
+            for row in rows:
+                campaign = row['campaign_id']
+                if campaign not in loaded or row['date_stop'] > loaded[campaign]:
+                    loaded[campaign] = row['date_stop']
+
+            # Ações/conversões das linhas válidas, em formato longo
+            rejected = {id(reject['row']) for reject in rejects}
+            with self.metrics.timer('stage_seconds', stage='normalize_actions'):
+                actions = normalize_actions([row for row in raw_rows if id(row) not in rejected],
+                                            self.action_metrics)
+
+            with self.metrics.timer('db_flush_seconds', table='campaign'):
+                report = upsert_campaigns(db, rows)
+            self.metrics.incr('rows_loaded_total', report['inserted'] + report['updated'], table='campaign')
+            with self.metrics.timer('db_flush_seconds', table='campaign_action'):
+                # Todos os dias recarregados, para remover ações que deixaram de existir
+                written = upsert_campaign_actions(db, actions,
+                                                  reloaded=[(row['campaign_id'], row['date_start']) for row in rows],
+                                                  metrics=self.action_metrics)
+            self.metrics.incr('rows_loaded_total', written, table='campaign_action')
+            advance_watermarks(db, self.ad_acc_id, loaded)
+            with self.metrics.timer('db_commit_seconds'):
+                db.commit()
+            logger.info(f"Dados históricos de {len(loaded)} campanhas salvos com sucesso.")
         except Exception as e:
-            logger.error(f"Erro ao salvar campanhas no banco de dados: {e}")
+            logger.error(f"Erro ao salvar dados históricos no banco de dados: {e}")
             db.rollback()
-        finally:
-            db.close()
+            raise
+        return report
+
+    def fetch_and_save_campaign_breakdowns(self, breakdowns, time_range=None):
+        """
+        Coleta os insights diários das campanhas quebrados por dimensões (idade, gênero,
+        posicionamento...) e salva na tabela campaign_breakdown. Os breakdowns
+        multiplicam o volume, então cada página é codificada e gravada assim que chega.
+
+        Args:
+            breakdowns (list | str): Até duas dimensões (ex: ['age', 'gender'] ou 'placement').
+            time_range (tuple): Datas (início, fim) (padrão: janela de reprocessamento até hoje).
+
+        Returns:
+            int: Quantidade de linhas inseridas ou alteradas.
+        """
+        time_range = time_range or extraction_range(None, lookback_days=RESTATEMENT_DAYS)
+        written = 0
+        try:
+            with session_scope() as db:
+                for page in self.fb_api.iter_insights(self.ad_acc_id, 'campaign',
+                                                      fields=['campaign_id'] + BREAKDOWN_METRICS,
+                                                      breakdowns=breakdowns, time_range=time_range):
+                    with self.metrics.timer('stage_seconds', stage='encode_breakdowns'):
+                        encoded = encode_breakdowns(page, breakdowns)
+                    with self.metrics.timer('db_flush_seconds', table='campaign_breakdown'):
+                        page_written = upsert_campaign_breakdowns(db, encoded, breakdowns)
+                    self.metrics.incr('rows_loaded_total', page_written, table='campaign_breakdown')
+                    written += page_written
+                    with self.metrics.timer('db_commit_seconds'):
+                        db.commit()
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Falha ao coletar os breakdowns {breakdowns}: {e}")
+        return written
 
     def get_campaign_by_id(self, campaign_id: int):
         """
         Busca uma campanha no banco de dados pelo ID.
         """
-        db = SessionLocal()
         try:
-            campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
-            if not campaign:
-                logger.error(f"Campanha com ID {campaign_id} não encontrada.")
-                return None
-            return CampaignResponse.from_orm(campaign)  # Converte o Model para o Schema
+            with session_scope() as db:
+                campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+                if not campaign:
+                    logger.error(f"Campanha com ID {campaign_id} não encontrada.")
+                    return None
+                return CampaignResponse.model_validate(campaign)  # Converte o Model para o Schema
         except Exception as e:
             logger.error(f"Erro ao buscar campanha: {e}")
-            return None
-        finally:
-            db.close()
\ No newline at end of file
+            return None
\ No newline at end of file
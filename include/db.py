@@ -1,12 +1,124 @@
+from contextlib import contextmanager
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from dotenv import load_dotenv
 import os
 
 
-load_dotenv()
-URLPOSTGRES=os.getenv("URLPOSTGRES")
-engine = create_engine(URLPOSTGRES)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
+
+# Engine e fábrica de sessões são criados apenas no primeiro uso (dentro das tasks),
+# e não na importação do módulo: o scheduler do Airflow importa as DAGs a cada parse.
+_engine = None
+_session_factory = None
+
+
+def _env_flag(name, default):
+    return os.getenv(name, str(default)).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def engine_options(url):
+    """
+    Monta as opções do pool de conexões a partir das variáveis de ambiente.
+
+    - DB_NULLPOOL: abre e fecha uma conexão por uso, para tasks curtas atrás de
+      um pooler externo (PgBouncer); ignora as opções de tamanho do pool.
+    - DB_POOL_SIZE / DB_MAX_OVERFLOW / DB_POOL_TIMEOUT: dimensionamento do pool.
+    - DB_POOL_RECYCLE: idade máxima (segundos) de uma conexão antes de ser reaberta.
+    - DB_POOL_PRE_PING: testa a conexão ao retirá-la do pool (evita conexões mortas).
+
+    Args:
+        url (str): URL do banco.
+
+    Returns:
+        dict: Argumentos para `create_engine`.
+    """
+    options = {'pool_pre_ping': _env_flag('DB_POOL_PRE_PING', True)}
+    if _env_flag('DB_NULLPOOL', False):
+        options['poolclass'] = NullPool
+        return options
+
+    options['pool_recycle'] = int(os.getenv('DB_POOL_RECYCLE', 1800))
+    # O SQLite (usado nos testes) tem pool próprio, sem opções de tamanho
+    if make_url(url).get_backend_name() != 'sqlite':
+        options['pool_size'] = int(os.getenv('DB_POOL_SIZE', 5))
+        options['max_overflow'] = int(os.getenv('DB_MAX_OVERFLOW', 10))
+        options['pool_timeout'] = int(os.getenv('DB_POOL_TIMEOUT', 30))
+    return options
+
+
+def get_engine():
+    """
+    Retorna o engine do banco, criando-o na primeira chamada a partir de URLPOSTGRES.
+
+    Returns:
+        sqlalchemy.engine.Engine: Engine compartilhado pelo processo.
+    """
+    global _engine
+    if _engine is None:
+        load_dotenv()
+        url = os.getenv("URLPOSTGRES")
+        _engine = create_engine(url, **engine_options(url))
+    return _engine
+
+
+def get_session_factory():
+    """
+    Retorna a fábrica de sessões ligada ao engine, criando-a na primeira chamada.
+
+    Returns:
+        sqlalchemy.orm.sessionmaker: Fábrica de sessões.
+    """
+    global _session_factory
+    if _session_factory is None:
+        _session_factory = sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
+    return _session_factory
+
+
+def SessionLocal():
+    """
+    Abre uma nova sessão do banco (mesmo uso do antigo `SessionLocal()`).
+    """
+    return get_session_factory()()
+
+
+@contextmanager
+def session_scope():
+    """
+    Unidade de trabalho: abre uma sessão, faz commit ao final ou rollback em caso
+    de erro, e sempre devolve a conexão ao pool.
+
+    Yields:
+        sqlalchemy.orm.Session: Sessão compartilhada pelas operações do bloco.
+    """
+    db = SessionLocal()
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def dispose_engine():
+    """
+    Fecha as conexões do pool e descarta o engine (ex.: ao final do processo ou
+    depois de um fork); o próximo uso cria um novo engine.
+    """
+    global _engine, _session_factory
+    if _engine is not None:
+        _engine.dispose()
+    _engine = None
+    _session_factory = None
+
+
+def __getattr__(name):
+    # Compatibilidade com `from include.db import engine`, sem criar o engine na importação
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,263 @@
+import asyncio
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
+
+import aiohttp
+
+from .extract import BaseGraphAPI
+from .retry import CircuitOpenError
+
+# Configura o logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class AsyncGraphAPI(BaseGraphAPI):
+    """
+    Versão assíncrona do GraphAPI: dispara várias requisições ao mesmo tempo,
+    limitadas por `max_concurrency`, e devolve os mesmos formatos de dados.
+    """
+
+    def __init__(self, fb_api_token, max_concurrency=10, timeouts=None, throttler=None,
+                 retry_policy=None, circuit_breaker=None, metrics=None):
+        super().__init__(fb_api_token, timeouts, throttler, retry_policy, circuit_breaker, metrics)
+        self.max_concurrency = max_concurrency
+        self.session = None
+
+
+    async def __aenter__(self):
+        self.session = self._build_session()
+        return self
+
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+
+    def _build_session(self):
+        """
+        Cria a sessão aiohttp. Deve ser chamada dentro de um event loop em execução.
+        """
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+        return aiohttp.ClientSession(connector=connector,
+                                     headers={'Accept-Encoding': 'gzip, deflate'})
+
+
+    async def close(self):
+        """
+        Fecha a sessão aiohttp, se estiver aberta.
+        """
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+    @asynccontextmanager
+    async def _session_scope(self):
+        """
+        Reaproveita a sessão aberta por `async with`; caso não exista,
+        abre uma sessão temporária que é fechada ao final da operação.
+        """
+        if self.session is not None:
+            yield self.session
+            return
+
+        session = self._build_session()
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+    async def _get_pages(self, session, url, timeout, ad_acc=None):
+        """
+        Busca todas as páginas de um endpoint seguindo o cursor `paging.next`.
+
+        Args:
+            session (aiohttp.ClientSession): Sessão HTTP.
+            url (str): URL da primeira página (sem o token de acesso).
+            timeout (tuple): Tempo limite (conexão, leitura) em segundos.
+            ad_acc (str): Conta de anúncio das páginas, usada como chave do circuito.
+
+        Returns:
+            list: Linhas (`data`) de todas as páginas.
+
+        Raises:
+            aiohttp.ClientError: Em caso de falha na requisição.
+            asyncio.TimeoutError: Se a requisição exceder o tempo limite.
+        """
+        connect, read = timeout
+        client_timeout = aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+        rows = []
+        next_url = url + self.token
+        while next_url:
+            page = await self._get_json(session, next_url, client_timeout, ad_acc)
+            self._record_page(next_url, page.get('data', []))
+            rows.extend(page.get('data', []))
+            # A URL de `paging.next` já traz o token e o cursor `after`
+            next_url = page.get('paging', {}).get('next')
+        return rows
+
+
+    async def _get_json(self, session, url, client_timeout, ad_acc=None):
+        """
+        Busca uma página respeitando o throttler e a política de retry,
+        como `GraphAPI._request`.
+
+        Returns:
+            dict: Corpo JSON da resposta.
+
+        Raises:
+            CircuitOpenError: Se o circuito da conta estiver aberto.
+            aiohttp.ClientError: Se a última tentativa falhar.
+            asyncio.TimeoutError: Se a última tentativa exceder o tempo limite.
+        """
+        key = self._circuit_key(ad_acc)
+        self.circuit_breaker.check(key)
+        started = time.monotonic()
+        attempt = 0
+
+        while True:
+            attempt += 1
+            await self.throttler.wait_async(key)
+            sent = time.monotonic()
+            try:
+                async with session.get(url, timeout=client_timeout) as response:
+                    self.throttler.update(response.headers, key)
+                    body = await response.read()
+                    latency = time.monotonic() - sent
+                    self.retry_stats.record_attempt(latency)
+                    self._record_response(url, response.status, response.content_length or len(body), latency)
+                    if response.status < 400:
+                        self.circuit_breaker.record_success(key)
+                        return json.loads(body)
+
+                    try:
+                        payload = json.loads(body)
+                    except ValueError:
+                        payload = None
+                    if not self.retry_policy.is_retryable_error(response.status, payload):
+                        self.circuit_breaker.record_success(key)
+                        response.raise_for_status()  # Levanta exceção para códigos de status 4xx/5xx
+
+                    delay = self.retry_policy.backoff(attempt)
+                    if not self.retry_policy.should_retry(attempt, time.monotonic() - started, delay):
+                        self.retry_stats.record_give_up()
+                        self.metrics.incr('give_ups_total', endpoint=self._endpoint_name(url))
+                        self.circuit_breaker.record_failure(key)
+                        response.raise_for_status()
+                    reason = f"HTTP {response.status}"
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                latency = time.monotonic() - sent
+                self.retry_stats.record_attempt(latency)
+                self._record_response(url, type(e).__name__, 0, latency)
+                delay = self.retry_policy.backoff(attempt)
+                if not self.retry_policy.should_retry(attempt, time.monotonic() - started, delay):
+                    self.retry_stats.record_give_up()
+                    self.metrics.incr('give_ups_total', endpoint=self._endpoint_name(url))
+                    self.circuit_breaker.record_failure(key)
+                    raise
+                reason = e
+
+            logger.warning(f"Tentativa {attempt} falhou ({reason}); repetindo em {delay:.1f}s.")
+            self.retry_stats.record_retry()
+            self.metrics.incr('retries_total', endpoint=self._endpoint_name(url))
+            await asyncio.sleep(delay)
+
+
+    async def _get(self, url, timeout, description, ad_acc=None):
+        """
+        Executa a coleta paginada tratando os erros como o GraphAPI síncrono.
+
+        Returns:
+            dict: Dados no formato {'data': [...]}. Retorna None em caso de erro.
+        """
+        try:
+            async with self._session_scope() as session:
+                data = {'data': await self._get_pages(session, url, timeout, ad_acc)}
+            logger.info(f"{description} coletados com sucesso.")
+        except asyncio.TimeoutError:
+            logger.error("A requisição excedeu o tempo limite.")
+            return None
+        except (aiohttp.ClientError, CircuitOpenError) as e:
+            logger.error(f"Erro na requisição: {e}")
+            return None
+        except json.JSONDecodeError as e:
+            logger.error(f"Erro ao decodificar JSON: {e}")
+            return None
+
+        return data
+
+
+    async def get_insights(self, ad_acc, level='campaign', fields=None, breakdowns=None, time_range=None):
+        """
+        Versão assíncrona de `GraphAPI.get_insights`.
+        """
+        data = await self._get(self._insights_url(ad_acc, level, fields, breakdowns, time_range),
+                               self.timeouts['insights'], "Dados de insights", ad_acc)
+        if data is not None:
+            self._process_conversions(data['data'])
+        return data
+
+
+    async def get_campaigns_status(self, ad_acc):
+        """
+        Versão assíncrona de `GraphAPI.get_campaigns_status`.
+        """
+        return await self._get(self._campaigns_status_url(ad_acc),
+                               self.timeouts['campaigns'], "Dados de status das campanhas", ad_acc)
+
+
+    async def get_adset_status(self, ad_acc):
+        """
+        Versão assíncrona de `GraphAPI.get_adset_status`.
+        """
+        return await self._get(self._adset_status_url(ad_acc),
+                               self.timeouts['adsets'], "Dados de status dos conjuntos de anúncios", ad_acc)
+
+
+    async def get_data_over_time(self, campaign, fields=None, time_range=None, ad_acc=None):
+        """
+        Versão assíncrona de `GraphAPI.get_data_over_time`.
+        """
+        data = await self._get(self._data_over_time_url(campaign, fields, time_range),
+                               self.timeouts['data_over_time'],
+                               f"Dados históricos da campanha {campaign}", ad_acc)
+        if data is not None:
+            self._process_conversions(data['data'])
+        return data
+
+
+    async def get_campaigns_data_over_time(self, campaign_ids, fields=None, time_ranges=None, ad_acc=None):
+        """
+        Coleta os dados históricos de várias campanhas em paralelo.
+        No máximo `max_concurrency` requisições ficam em andamento ao mesmo tempo.
+
+        Args:
+            campaign_ids (list): IDs das campanhas.
+            fields: Campos usados pelo consumidor (padrão: todos os campos de campanha).
+            time_ranges (dict): Datas (início, fim) de cada campanha ({campaign_id: (início, fim)}).
+                Campanhas ausentes usam os últimos 30 dias.
+            ad_acc (str): Conta de anúncio das campanhas, usada como chave do circuito
+                (padrão: circuito 'default').
+
+        Returns:
+            dict: Dados históricos de cada campanha ({campaign_id: dados}).
+                Campanhas com erro ficam com valor None.
+        """
+        if self.session is None:
+            # Sem `async with`: abre uma sessão compartilhada só para este lote
+            async with self:
+                return await self.get_campaigns_data_over_time(campaign_ids, fields, time_ranges, ad_acc)
+
+        time_ranges = time_ranges or {}
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch(campaign):
+            async with semaphore:
+                return await self.get_data_over_time(campaign, fields, time_ranges.get(campaign), ad_acc)
+
+        results = await asyncio.gather(*(fetch(c) for c in campaign_ids))
+        return dict(zip(campaign_ids, results))
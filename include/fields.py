@@ -0,0 +1,101 @@
+# Projeção de campos: pede à Graph API só os campos de insights que cada nível
+# de agregação suporta e que o consumidor (schema ou model) realmente usa.
+
+# Métricas disponíveis em qualquer nível
+INSIGHTS_METRICS = ['spend', 'cpc', 'cpm', 'clicks', 'frequency', 'conversions', 'conversion_values']
+
+# Campos de insights disponíveis em cada nível de agregação
+LEVEL_FIELDS = {
+    'account': INSIGHTS_METRICS,
+    'campaign': INSIGHTS_METRICS + ['objective', 'campaign_name', 'campaign_id'],
+    'adset': INSIGHTS_METRICS + ['objective', 'campaign_name', 'campaign_id',
+                                 'adset_name', 'adset_id'],
+    'ad': INSIGHTS_METRICS + ['objective', 'campaign_name', 'campaign_id',
+                              'adset_name', 'adset_id', 'ad_name', 'ad_id'],
+}
+
+# Métricas que só são pedidas quando o consumidor as lista explicitamente
+# (`actions` traz todos os tipos de ação e aumenta bastante o payload)
+OPTIONAL_METRICS = ['actions']
+
+# Dimensões de breakdown aceitas em `breakdowns` (cada linha volta com o valor da dimensão)
+BREAKDOWNS = ['age', 'gender', 'country', 'region', 'publisher_platform', 'platform_position',
+              'device_platform', 'impression_device',
+              'hourly_stats_aggregated_by_advertiser_time_zone',
+              'hourly_stats_aggregated_by_audience_time_zone']
+
+# Atalhos para combinações usadas com frequência
+BREAKDOWN_ALIASES = {
+    'placement': ['publisher_platform', 'platform_position'],
+    'hourly': ['hourly_stats_aggregated_by_advertiser_time_zone'],
+}
+
+# Campos que a API devolve sempre, sem precisar pedir
+IMPLICIT_FIELDS = {'date_start', 'date_stop'}
+
+
+def consumer_field_names(consumer):
+    """
+    Nomes dos campos de um consumidor: schema pydantic, model SQLAlchemy ou lista de nomes.
+    """
+    if hasattr(consumer, 'model_fields'):  # schema pydantic (ex: CampaignCreate)
+        return list(consumer.model_fields)
+    if hasattr(consumer, '__table__'):  # model SQLAlchemy (ex: Campaign)
+        return [column.name for column in consumer.__table__.columns]
+    return list(consumer)
+
+
+def fields_for(level='campaign', consumer=None):
+    """
+    Lista de campos a pedir nos insights de um nível.
+
+    Args:
+        level (str): Nível de agregação ('account', 'campaign', 'adset' ou 'ad').
+        consumer: Schema, model ou lista de campos que serão usados. Se None,
+            pede todos os campos disponíveis no nível.
+
+    Returns:
+        list: Campos de insights, na ordem em que aparecem no consumidor.
+
+    Raises:
+        ValueError: Se o nível não existir ou nenhum campo do consumidor estiver disponível.
+    """
+    if level not in LEVEL_FIELDS:
+        raise ValueError(f"Nível de insights desconhecido: {level}")
+
+    available = LEVEL_FIELDS[level]
+    if consumer is None:
+        return list(available)
+    available = available + OPTIONAL_METRICS
+
+    fields = [name for name in consumer_field_names(consumer)
+              if name in available and name not in IMPLICIT_FIELDS]
+    if not fields:
+        raise ValueError(f"Nenhum campo de {consumer!r} está disponível no nível {level}.")
+    return fields
+
+
+def breakdowns_for(breakdowns):
+    """
+    Expande os atalhos e valida as dimensões de breakdown pedidas.
+
+    Args:
+        breakdowns (list | str): Dimensões (ex: ['age', 'gender'] ou 'placement').
+
+    Returns:
+        list: Dimensões aceitas pela API, sem repetições e na ordem pedida.
+
+    Raises:
+        ValueError: Se alguma dimensão não existir.
+    """
+    if isinstance(breakdowns, str):
+        breakdowns = [breakdowns]
+
+    expanded = []
+    for name in breakdowns:
+        for dimension in BREAKDOWN_ALIASES.get(name, [name]):
+            if dimension not in BREAKDOWNS:
+                raise ValueError(f"Breakdown desconhecido: {dimension}")
+            if dimension not in expanded:
+                expanded.append(dimension)
+    return expanded
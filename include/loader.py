@@ -0,0 +1,224 @@
+# Carga em lote no PostgreSQL: um único INSERT ... ON CONFLICT por bloco de
+# linhas, em vez de um db.add() por linha. Reexecutar a mesma carga não
+# duplica dados (upsert pela chave campaign_id + date_start).
+import logging
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import delete, literal_column, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+
+from .breakdowns import BREAKDOWN_METRICS
+from .fields import breakdowns_for
+from .models import CAMPAIGN_PARTITIONED, BreakdownValue, Campaign, CampaignAction, CampaignBreakdown
+from .partitions import ensure_partitions
+
+# Configura o logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Chave natural de uma linha campanha-dia
+CAMPAIGN_KEY = ('campaign_id', 'date_start')
+
+# Chave natural de uma linha da tabela longa de ações
+CAMPAIGN_ACTION_KEY = ('campaign_id', 'date_start', 'metric', 'action_type')
+
+# Chave natural de uma linha de breakdown
+CAMPAIGN_BREAKDOWN_KEY = ('campaign_id', 'date_start', 'dimension_1_id', 'dimension_2_id')
+
+# Ids já conhecidos do dicionário de breakdowns ({(dimensão, valor): id}); os ids não
+# mudam, então cada valor só é consultado no banco uma vez por processo
+_breakdown_value_ids = {}
+
+# Colunas atualizadas quando a linha já existe
+CAMPAIGN_UPDATE_COLUMNS = ('spend', 'cpc', 'cpm', 'objective', 'clicks', 'campaign_name',
+                           'frequency', 'date_stop')
+
+
+def upsert_campaigns(db, rows, chunk_size=1000):
+    """
+    Insere ou atualiza linhas campanha-dia com INSERT ... ON CONFLICT.
+
+    Linhas iguais às já gravadas não são reescritas. Linhas repetidas no mesmo
+    lote (mesma chave) ficam com a última ocorrência. Não faz commit.
+
+    Args:
+        db (Session): Sessão do banco de dados (PostgreSQL).
+        rows (Iterable[dict]): Linhas com as colunas de `Campaign` (ex: `CampaignCreate.model_dump()`).
+        chunk_size (int): Quantidade de linhas por comando INSERT.
+
+    Returns:
+        dict: Quantidade de linhas inseridas, atualizadas e inalteradas.
+    """
+    # Deduplica pela chave, mantendo a ordem de chegada
+    unique_rows = {tuple(row[k] for k in CAMPAIGN_KEY): row for row in rows}
+    rows = list(unique_rows.values())
+    report = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+
+    if CAMPAIGN_PARTITIONED and rows:
+        # Normalmente as partições já foram criadas antes da carga (ver
+        # CampaignController.prepare_partitions); aqui só é criado o que faltar
+        dates = [row['date_start'] for row in rows]
+        ensure_partitions(db, min(dates), max(dates))
+
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        stmt = insert(Campaign).values(chunk)
+        excluded = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(CAMPAIGN_KEY),
+            set_={column: excluded[column] for column in CAMPAIGN_UPDATE_COLUMNS},
+            # Só atualiza se algum valor mudou
+            where=or_(*(getattr(Campaign, column).is_distinct_from(excluded[column])
+                        for column in CAMPAIGN_UPDATE_COLUMNS)),
+        ).returning(literal_column('(xmax = 0)').label('inserted'))  # xmax = 0: linha nova
+
+        written = db.execute(stmt).scalars().all()
+        inserted = sum(1 for was_inserted in written if was_inserted)
+        report['inserted'] += inserted
+        report['updated'] += len(written) - inserted
+        report['unchanged'] += len(chunk) - len(written)
+
+    logger.info(f"Carga de campanhas: {report['inserted']} inseridas, {report['updated']} atualizadas, "
+                f"{report['unchanged']} inalteradas.")
+    return report
+
+
+def upsert_campaign_actions(db, actions, reloaded=None, metrics=None, chunk_size=5000):
+    """
+    Insere ou atualiza as ações normalizadas (ver `include.actions.normalize_actions`)
+    com INSERT ... ON CONFLICT, no mesmo padrão de `upsert_campaigns`. As ações já
+    gravadas dos pares (campaign_id, date_start) recarregados que não vieram de novo
+    (ex: conversão estornada) são removidas, apenas nas métricas pedidas nesta carga.
+    Não faz commit.
+
+    Args:
+        db (Session): Sessão do banco de dados (PostgreSQL).
+        actions (pd.DataFrame): Colunas campaign_id, date_start, metric, action_type e value.
+        reloaded (Iterable[tuple]): Pares (campaign_id, date_start) recarregados, inclusive
+            os que ficaram sem nenhuma ação (padrão: os pares presentes em `actions`).
+        metrics (Iterable[str]): Métricas de ações pedidas à API (ex: `ACTION_METRICS`);
+            ações de outras métricas nunca são removidas (padrão: as presentes em `actions`).
+        chunk_size (int): Quantidade de linhas (ou pares) por comando.
+
+    Returns:
+        int: Quantidade de linhas inseridas ou alteradas.
+    """
+    # Deduplica pela chave, mantendo a última ocorrência
+    rows = (actions.drop_duplicates(subset=list(CAMPAIGN_ACTION_KEY), keep='last')
+                   .astype({'metric': str, 'action_type': str})
+                   .to_dict('records'))
+    keys = [tuple(row[k] for k in CAMPAIGN_ACTION_KEY) for row in rows]
+    if reloaded is None:
+        reloaded = (key[:2] for key in keys)
+    reloaded = list(dict.fromkeys(reloaded))
+    metrics = sorted({key[2] for key in keys} if metrics is None else set(metrics))
+
+    # Remove as chaves que sumiram dos pares recarregados, na mesma transação da carga
+    deleted = 0
+    for start in range(0, len(reloaded) if metrics else 0, chunk_size):
+        pairs = reloaded[start:start + chunk_size]
+        stmt = delete(CampaignAction).where(
+            tuple_(CampaignAction.campaign_id, CampaignAction.date_start).in_(pairs),
+            CampaignAction.metric.in_(metrics))
+        chunk_pairs = set(pairs)
+        kept = [key for key in keys if key[:2] in chunk_pairs]
+        if kept:
+            stmt = stmt.where(tuple_(*(getattr(CampaignAction, k) for k in CAMPAIGN_ACTION_KEY)).not_in(kept))
+        deleted += db.execute(stmt).rowcount
+
+    written = 0
+    for start in range(0, len(rows), chunk_size):
+        stmt = insert(CampaignAction).values(rows[start:start + chunk_size])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(CAMPAIGN_ACTION_KEY),
+            set_={'value': stmt.excluded.value},
+            where=CampaignAction.value.is_distinct_from(stmt.excluded.value),
+        )
+        written += db.execute(stmt).rowcount
+
+    logger.info(f"Carga de ações: {written} de {len(rows)} linhas inseridas ou alteradas, "
+                f"{deleted} removidas.")
+    return written
+
+
+def breakdown_value_ids(db, pairs):
+    """
+    Devolve o id de cada (dimensão, valor), inserindo no dicionário os que faltam.
+
+    Args:
+        db (Session): Sessão do banco de dados (PostgreSQL).
+        pairs (Iterable[tuple]): Pares (dimensão, valor).
+
+    Returns:
+        dict: Id de cada par ({(dimensão, valor): id}).
+    """
+    pairs = set(pairs)
+    missing = [pair for pair in pairs if pair not in _breakdown_value_ids]
+    if missing:
+        db.execute(insert(BreakdownValue)
+                   .values([{'dimension': dimension, 'value': value} for dimension, value in missing])
+                   .on_conflict_do_nothing(index_elements=['dimension', 'value']))
+        found = db.execute(select(BreakdownValue.dimension, BreakdownValue.value, BreakdownValue.id)
+                           .where(tuple_(BreakdownValue.dimension, BreakdownValue.value).in_(missing)))
+        _breakdown_value_ids.update({(dimension, value): id_ for dimension, value, id_ in found})
+    return {pair: _breakdown_value_ids[pair] for pair in pairs}
+
+
+def _dimension_ids(db, column, dimension):
+    # Traduz uma coluna category para ids do dicionário: um id por categoria, e não por linha
+    categories = [str(value) for value in column.cat.categories]
+    ids = breakdown_value_ids(db, [(dimension, value) for value in categories])
+    lookup = np.array([ids[(dimension, value)] for value in categories] + [0], dtype='int64')
+    # Código -1 (valor ausente) aponta para o último item e fica nulo
+    codes = column.cat.codes.to_numpy()
+    return pd.arrays.IntegerArray(lookup[codes], mask=codes < 0)
+
+
+def upsert_campaign_breakdowns(db, breakdown_rows, breakdowns, chunk_size=5000):
+    """
+    Grava as linhas de breakdown (ver `include.breakdowns.encode_breakdowns`) com as
+    dimensões substituídas pelos ids do dicionário `breakdown_value`. Não faz commit.
+
+    Args:
+        db (Session): Sessão do banco de dados (PostgreSQL).
+        breakdown_rows (pd.DataFrame): Página codificada por `encode_breakdowns`.
+        breakdowns (list | str): Dimensões da consulta (na mesma ordem).
+        chunk_size (int): Quantidade de linhas por comando INSERT.
+
+    Returns:
+        int: Quantidade de linhas inseridas ou alteradas.
+    """
+    if breakdown_rows.empty:
+        return 0
+    dimensions = breakdowns_for(breakdowns)
+
+    try:
+        facts = breakdown_rows[['date_start'] + BREAKDOWN_METRICS].copy()
+        facts['campaign_id'] = breakdown_rows['campaign_id'].astype(str)
+        facts['dimension_1_id'] = _dimension_ids(db, breakdown_rows[dimensions[0]], dimensions[0])
+        facts['dimension_2_id'] = (_dimension_ids(db, breakdown_rows[dimensions[1]], dimensions[1])
+                                   if len(dimensions) > 1 else None)
+        facts = facts.drop_duplicates(subset=list(CAMPAIGN_BREAKDOWN_KEY), keep='last')
+        # NaN -> None (NULL no banco)
+        rows = facts.astype(object).where(facts.notna(), None).to_dict('records')
+
+        written = 0
+        for start in range(0, len(rows), chunk_size):
+            stmt = insert(CampaignBreakdown).values(rows[start:start + chunk_size])
+            excluded = stmt.excluded
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(CAMPAIGN_BREAKDOWN_KEY),
+                set_={column: excluded[column] for column in BREAKDOWN_METRICS},
+                where=or_(*(getattr(CampaignBreakdown, column).is_distinct_from(excluded[column])
+                            for column in BREAKDOWN_METRICS)),
+            )
+            written += db.execute(stmt).rowcount
+    except Exception:
+        # Ids inseridos nesta transação deixam de existir se ela for desfeita
+        _breakdown_value_ids.clear()
+        raise
+
+    logger.info(f"Carga de breakdowns ({', '.join(dimensions)}): {written} de {len(rows)} "
+                f"linhas inseridas ou alteradas.")
+    return written
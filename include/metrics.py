@@ -0,0 +1,163 @@
+# Instrumentação do pipeline: contadores e tempos por etapa (requisições, bytes,
+# páginas, linhas lidas/validadas/carregadas, gravação no banco). O resumo vai
+# para o XCom das tasks e pode ser exportado no formato texto do Prometheus.
+from contextlib import contextmanager
+import threading
+import time
+
+# Quantis calculados para cada série de tempos
+QUANTILES = (0.5, 0.99)
+
+
+def _series(name, labels):
+    """
+    Nome da série no formato do Prometheus: `nome{rótulo="valor",...}`.
+    """
+    if not labels:
+        return name
+    return name + '{' + ','.join(f'{key}="{value}"' for key, value in sorted(labels.items())) + '}'
+
+
+def _quantile(values, q):
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+class PipelineMetrics:
+    """
+    Registro de métricas de uma execução, seguro entre threads.
+
+    Exemplo:
+        metrics = PipelineMetrics()
+        metrics.incr('rows_loaded_total', 120, table='campaign')
+        with metrics.timer('db_flush_seconds', table='campaign'):
+            ...
+        metrics.summary()        # dict serializável (XCom)
+        metrics.to_prometheus()  # texto para o textfile collector / pushgateway
+    """
+
+    def __init__(self):
+        self.counters = {}
+        self.timings = {}
+        self._lock = threading.Lock()
+
+
+    def incr(self, name, value=1, **labels):
+        """
+        Soma `value` ao contador `name` com os rótulos informados.
+        """
+        key = _series(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+
+    def observe(self, name, seconds, **labels):
+        """
+        Registra uma medição de tempo (em segundos) na série `name`.
+        """
+        key = _series(name, labels)
+        with self._lock:
+            self.timings.setdefault(key, []).append(seconds)
+
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """
+        Mede o tempo do bloco `with` e registra em `name`, mesmo se houver erro.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+
+    def summary(self):
+        """
+        Returns:
+            dict: Contadores e, para cada série de tempos, quantidade, soma, p50, p99 e máximo.
+        """
+        with self._lock:
+            counters = dict(self.counters)
+            timings = {key: sorted(values) for key, values in self.timings.items()}
+        summary = {'counters': counters, 'timings': {}}
+        for key, values in timings.items():
+            summary['timings'][key] = {
+                'count': len(values),
+                'sum': sum(values),
+                **{f'p{int(q * 100)}': _quantile(values, q) for q in QUANTILES},
+                'max': values[-1],
+            }
+        return summary
+
+
+    def to_prometheus(self, prefix='meta_pipeline'):
+        """
+        Exporta as métricas no formato texto do Prometheus.
+        """
+        return summary_to_prometheus(self.summary(), prefix)
+
+
+def merge_summaries(summaries):
+    """
+    Junta resumos de várias tasks (ex: as instâncias de uma task mapeada).
+    Contadores, quantidades e somas são somados; os quantis ficam com o maior
+    valor entre as tasks (limite superior, já que não é possível recalculá-los).
+
+    Args:
+        summaries (Iterable[dict]): Resumos devolvidos por `PipelineMetrics.summary`.
+
+    Returns:
+        dict: Resumo combinado, no mesmo formato.
+    """
+    merged = {'counters': {}, 'timings': {}}
+    for summary in summaries:
+        for key, value in summary['counters'].items():
+            merged['counters'][key] = merged['counters'].get(key, 0) + value
+        for key, stats in summary['timings'].items():
+            current = merged['timings'].get(key)
+            if current is None:
+                merged['timings'][key] = dict(stats)
+                continue
+            for field, value in stats.items():
+                current[field] = current[field] + value if field in ('count', 'sum') else max(current[field], value)
+    return merged
+
+
+def summary_to_prometheus(summary, prefix='meta_pipeline'):
+    """
+    Converte um resumo em texto do Prometheus: contadores como `counter` e
+    séries de tempos como `summary` (quantis, _sum e _count).
+
+    Args:
+        summary (dict): Resumo de `PipelineMetrics.summary` ou `merge_summaries`.
+        prefix (str): Prefixo dos nomes das métricas.
+
+    Returns:
+        str: Texto pronto para o textfile collector do node_exporter ou um pushgateway.
+    """
+    lines = []
+    typed = set()
+
+    def declare(name, kind):
+        if name not in typed:
+            typed.add(name)
+            lines.append(f'# TYPE {name} {kind}')
+
+    for key, value in sorted(summary['counters'].items()):
+        name = f'{prefix}_{key}'
+        declare(name.split('{')[0], 'counter')
+        lines.append(f'{name} {value}')
+
+    for key, stats in sorted(summary['timings'].items()):
+        metric, _, labels = key.partition('{')
+        labels = labels.rstrip('}')
+        name = f'{prefix}_{metric}'
+        declare(name, 'summary')
+        for q in QUANTILES:
+            quantile = f'quantile="{q}"'
+            lines.append(f'{name}{{{labels + "," if labels else ""}{quantile}}} {stats[f"p{int(q * 100)}"]}')
+        suffix = '{' + labels + '}' if labels else ''
+        lines.append(f'{name}_sum{suffix} {stats["sum"]}')
+        lines.append(f'{name}_count{suffix} {stats["count"]}')
+
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,69 @@
+# Migração do banco para o layout da carga em lote: cria as tabelas novas
+# (extraction_watermark, campaign_action, breakdown_value, campaign_breakdown) e,
+# em bancos que já tinham a tabela campaign, remove as linhas duplicadas por
+# (campaign_id, date_start) e cria a chave única exigida pelo INSERT ... ON CONFLICT.
+# Pode ser executada mais de uma vez.
+#
+# Uso (com URLPOSTGRES definida, antes da primeira execução da DAG):
+#     python -m include.migrate
+import logging
+
+from sqlalchemy import inspect, text
+
+from .db import Base, get_engine
+from . import models  # noqa: F401 (registra os modelos em Base.metadata)
+
+# Configura o logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Mantém só a linha mais recente de cada (campaign_id, date_start); as demais são
+# cópias gravadas pelas cargas antigas (um db.add() por linha a cada execução)
+DEDUPE_CAMPAIGN = text("""
+    DELETE FROM campaign WHERE id IN (
+        SELECT id FROM (
+            SELECT id, ROW_NUMBER() OVER (
+                PARTITION BY campaign_id, date_start
+                ORDER BY created_at DESC NULLS LAST, id DESC
+            ) AS position
+            FROM campaign
+        ) ranked
+        WHERE position > 1
+    )
+""")
+
+# Índice único equivalente à constraint uq_campaign_campaign_date do modelo; o
+# ON CONFLICT (campaign_id, date_start) aceita qualquer um dos dois
+CAMPAIGN_INDEXES = (
+    text("CREATE UNIQUE INDEX IF NOT EXISTS uq_campaign_campaign_date ON campaign (campaign_id, date_start)"),
+    text("CREATE INDEX IF NOT EXISTS ix_campaign_date_start ON campaign (date_start)"),
+)
+
+
+def migrate(engine=None):
+    """
+    Aplica a migração em uma única transação.
+
+    Args:
+        engine (Engine): Engine do banco (padrão: o de `include.db`, a partir de URLPOSTGRES).
+
+    Returns:
+        int: Quantidade de linhas duplicadas removidas da tabela campaign.
+    """
+    engine = engine or get_engine()
+    with engine.begin() as connection:
+        legacy_campaign = inspect(connection).has_table('campaign')
+        # Tabelas que ainda não existem são criadas já com chaves e índices do modelo
+        Base.metadata.create_all(connection)
+
+        removed = 0
+        if legacy_campaign:
+            removed = connection.execute(DEDUPE_CAMPAIGN).rowcount
+            for statement in CAMPAIGN_INDEXES:
+                connection.execute(statement)
+    logger.info(f"Migração concluída: {removed} linhas duplicadas removidas da tabela campaign.")
+    return removed
+
+
+if __name__ == '__main__':
+    migrate()
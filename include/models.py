@@ -1,13 +1,26 @@
 # modelo: representação do banco de dados
 # view: como os dados vão vir - do request / schema
 # não necessariamente o schema tem que ser igual ao model
-from sqlalchemy import Column, Integer, String, Float, DateTime, Date
+from sqlalchemy import Column, Integer, String, Float, DateTime, Date, UniqueConstraint, Index, ForeignKey
 from sqlalchemy.sql import func
 from .db import Base
+import os
+
+# Particiona a tabela campaign por intervalo de date_start (somente PostgreSQL).
+# Com partições, a chave primária precisa incluir a coluna de particionamento.
+CAMPAIGN_PARTITIONED = os.getenv('CAMPAIGN_PARTITIONED', 'false').lower() == 'true'
 
 class Campaign(Base):
     __tablename__ = 'campaign'
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)  # ID único para cada registro
+    __table_args__ = (
+        # Uma linha por campanha e dia; chave usada pelo upsert da carga e pelas
+        # consultas por campanha + intervalo de datas
+        UniqueConstraint('campaign_id', 'date_start', name='uq_campaign_campaign_date'),
+        # Consultas por intervalo de datas de todas as campanhas (dashboards)
+        Index('ix_campaign_date_start', 'date_start'),
+        {'postgresql_partition_by': 'RANGE (date_start)'} if CAMPAIGN_PARTITIONED else {},
+    )
+    id = Column(Integer, primary_key=True, autoincrement=True)  # ID único para cada registro
     spend = Column(Float, nullable=False)  # Valor gasto na campanha
     cpc = Column(Float, nullable=False)  # Custo por clique
     cpm = Column(Float, nullable=False)  # Custo por mil impressões
@@ -16,6 +29,66 @@ class Campaign(Base):
     campaign_name = Column(String, nullable=False)  # Nome da campanha
     campaign_id = Column(String, nullable=False)  # ID da campanha
     frequency = Column(Float, nullable=False)  # Frequência de exibição
-    date_start = Column(Date, nullable=False)  # Data de início da campanha
+    date_start = Column(Date, nullable=False, primary_key=CAMPAIGN_PARTITIONED)  # Data de início da campanha
     date_stop = Column(Date, nullable=False)  # Data de término da campanha
-    created_at = Column(DateTime, default=func.now())  # Data de criação do registro no banco de dados
\ No newline at end of file
+    created_at = Column(DateTime, default=func.now())  # Data de criação do registro no banco de dados
+
+
+class ExtractionWatermark(Base):
+    # Última data já extraída de cada campanha (extração incremental)
+    __tablename__ = 'extraction_watermark'
+    __table_args__ = (UniqueConstraint('ad_account_id', 'campaign_id', name='uq_watermark_account_campaign'),)
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    ad_account_id = Column(String, nullable=False)  # ID da conta de anúncio
+    campaign_id = Column(String, nullable=False)  # ID da campanha
+    last_date = Column(Date, nullable=False)  # Última data (date_stop) carregada no banco
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())  # Data da última atualização
+
+
+class CampaignAction(Base):
+    # Ações/conversões por campanha e dia em formato longo: uma linha por tipo de ação
+    __tablename__ = 'campaign_action'
+    __table_args__ = (
+        # Chave do upsert; também atende às consultas por campanha + intervalo de datas
+        UniqueConstraint('campaign_id', 'date_start', 'metric', 'action_type',
+                         name='uq_campaign_action_key'),
+        # ROAS/CPA de um tipo de ação em um período, para todas as campanhas
+        Index('ix_campaign_action_type_date', 'action_type', 'date_start'),
+    )
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    campaign_id = Column(String, nullable=False)  # ID da campanha
+    date_start = Column(Date, nullable=False)  # Dia dos dados
+    metric = Column(String, nullable=False)  # Campo de origem (conversions, conversion_values, actions)
+    action_type = Column(String, nullable=False)  # Tipo da ação (ex: offsite_conversion.fb_pixel_purchase)
+    value = Column(Float, nullable=False)  # Quantidade ou valor da ação
+
+
+class BreakdownValue(Base):
+    # Dicionário dos valores de breakdown (ex: age = '18-24'): cada string é gravada
+    # uma única vez e as tabelas de fatos guardam apenas o id inteiro
+    __tablename__ = 'breakdown_value'
+    __table_args__ = (UniqueConstraint('dimension', 'value', name='uq_breakdown_value'),)
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    dimension = Column(String, nullable=False)  # Dimensão (ex: age, publisher_platform)
+    value = Column(String, nullable=False)  # Valor da dimensão (ex: 18-24, instagram)
+
+
+class CampaignBreakdown(Base):
+    # Métricas diárias de campanha por combinação de até duas dimensões de breakdown
+    __tablename__ = 'campaign_breakdown'
+    __table_args__ = (
+        # Chave do upsert; a segunda dimensão é opcional (NULLS NOT DISTINCT, PostgreSQL 15+)
+        UniqueConstraint('campaign_id', 'date_start', 'dimension_1_id', 'dimension_2_id',
+                         name='uq_campaign_breakdown_key', postgresql_nulls_not_distinct=True),
+        Index('ix_campaign_breakdown_date_start', 'date_start'),
+    )
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    campaign_id = Column(String, nullable=False)  # ID da campanha
+    date_start = Column(Date, nullable=False)  # Dia dos dados
+    dimension_1_id = Column(Integer, ForeignKey('breakdown_value.id'), nullable=False)  # Primeira dimensão
+    dimension_2_id = Column(Integer, ForeignKey('breakdown_value.id'), nullable=True)  # Segunda dimensão (opcional)
+    spend = Column(Float, nullable=False)  # Valor gasto
+    clicks = Column(Integer, nullable=False)  # Número de cliques
+    cpc = Column(Float, nullable=True)  # Custo por clique
+    cpm = Column(Float, nullable=True)  # Custo por mil impressões
+    frequency = Column(Float, nullable=True)  # Frequência de exibição
\ No newline at end of file
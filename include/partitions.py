@@ -0,0 +1,117 @@
+# Partições mensais da tabela campaign (quando CAMPAIGN_PARTITIONED=true).
+# Cada mês é uma tabela própria, criada antes da carga (na task que lista as
+# campanhas, antes das tasks paralelas), e meses antigos podem ser desanexados
+# (DETACH) ou removidos sem varrer a tabela.
+from datetime import date
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError, ProgrammingError
+
+from .models import Campaign
+
+# Configura o logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Erros do PostgreSQL quando outra transação cria a mesma partição ao mesmo tempo:
+# duplicate_table e unique_violation (no catálogo pg_type)
+DUPLICATE_PARTITION_CODES = ('42P07', '23505')
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def next_month(day):
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def partition_name(month, table=Campaign.__tablename__):
+    return f"{table}_p{month:%Y_%m}"
+
+
+def ensure_partitions(db, first_day, last_day, table=Campaign.__tablename__):
+    """
+    Cria (se ainda não existirem) as partições mensais que cobrem o intervalo.
+    Só os meses que faltam executam o CREATE, cada um em um savepoint: se outra
+    transação criar a mesma partição ao mesmo tempo, o erro de duplicidade é
+    ignorado sem desfazer a transação atual.
+
+    Args:
+        db (Session): Sessão do banco de dados (PostgreSQL).
+        first_day (date): Primeira data a ser carregada.
+        last_day (date): Última data a ser carregada.
+        table (str): Tabela particionada.
+
+    Returns:
+        list: Nomes das partições do intervalo.
+    """
+    existing = set(list_partitions(db, table))
+    names = []
+    month = month_start(first_day)
+    while month <= last_day:
+        name = partition_name(month, table)
+        if name not in existing:
+            _create_partition(db, name, month, table)
+        names.append(name)
+        month = next_month(month)
+    return names
+
+
+def _create_partition(db, name, month, table):
+    try:
+        with db.begin_nested():
+            db.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month(month).isoformat()}')"
+            ))
+        logger.info(f"Partição {name} criada.")
+    except (ProgrammingError, IntegrityError) as e:
+        if getattr(e.orig, 'pgcode', None) not in DUPLICATE_PARTITION_CODES:
+            raise
+        logger.info(f"Partição {name} já criada por outra transação.")
+
+
+def list_partitions(db, table=Campaign.__tablename__):
+    """
+    Returns:
+        list: Nomes das partições anexadas à tabela.
+    """
+    result = db.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+        "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+        "WHERE parent.relname = :table ORDER BY child.relname"
+    ), {'table': table})
+    return [row[0] for row in result]
+
+
+def detach_partitions_before(db, cutoff, drop=False, table=Campaign.__tablename__):
+    """
+    Desanexa as partições de meses inteiramente anteriores a `cutoff`.
+    Os dados continuam disponíveis na tabela desanexada, a menos que `drop=True`.
+
+    Args:
+        db (Session): Sessão do banco de dados (PostgreSQL).
+        cutoff (date): Data mínima mantida na tabela.
+        drop (bool): Remove as partições desanexadas.
+        table (str): Tabela particionada.
+
+    Returns:
+        list: Nomes das partições desanexadas.
+    """
+    detached = []
+    prefix = f"{table}_p"
+    for name in list_partitions(db, table):
+        if not name.startswith(prefix):
+            continue
+        year, month = name[len(prefix):].split('_')
+        if next_month(date(int(year), int(month), 1)) > cutoff:
+            continue
+        db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+        if drop:
+            db.execute(text(f"DROP TABLE {name}"))
+        logger.info(f"Partição {name} {'removida' if drop else 'desanexada'}.")
+        detached.append(name)
+    return detached
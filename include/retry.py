@@ -0,0 +1,191 @@
+import logging
+import random
+import statistics
+import threading
+import time
+
+import requests
+
+# Configura o logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# Status HTTP transitórios
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# Códigos de erro da Graph API que indicam falha temporária ou limite de uso
+RETRYABLE_GRAPH_CODES = {
+    2,      # serviço temporariamente indisponível
+    4,      # limite de chamadas do app
+    17,     # limite de chamadas do usuário
+    32,     # limite de chamadas da página
+    341,    # limite do app atingido
+    613,    # limite de chamadas excedido
+    80000, 80001, 80002, 80003, 80004, 80005, 80006, 80008, 80009, 80014,  # limites de uso por caso (BUC)
+}
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """
+    Requisição recusada porque o circuito da conta está aberto.
+    Herda de RequestException para ser tratada como os demais erros de requisição.
+    """
+
+
+class RetryPolicy:
+    """
+    Define quando e quanto esperar para repetir uma requisição:
+    backoff exponencial com jitter ("full jitter"), limitado por número de
+    tentativas e por tempo total decorrido.
+    """
+
+    def __init__(self, max_attempts=5, base_delay=1, max_delay=60, max_elapsed=300, jitter=True):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_elapsed = max_elapsed
+        self.jitter = jitter
+
+
+    def is_retryable_error(self, status_code, payload):
+        """
+        Classifica uma resposta de erro da Graph API.
+
+        Args:
+            status_code (int): Status HTTP da resposta.
+            payload (dict): Corpo JSON da resposta (ou None).
+
+        Returns:
+            bool: True se vale a pena repetir a requisição.
+        """
+        error = (payload or {}).get('error', {}) if isinstance(payload, dict) else {}
+        if error.get('code') in RETRYABLE_GRAPH_CODES or error.get('is_transient'):
+            return True
+        # Pedido grande demais não melhora repetindo (ver relatório assíncrono)
+        if 'reduce the amount of data' in str(error.get('message', '')).lower():
+            return False
+        return status_code in RETRYABLE_STATUS
+
+
+    def is_retryable_response(self, response):
+        """
+        Indica se uma resposta `requests` deve ser repetida.
+        """
+        if response.status_code < 400:
+            return False
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = None
+        return self.is_retryable_error(response.status_code, payload)
+
+
+    def backoff(self, attempt):
+        """
+        Tempo de espera (segundos) antes da tentativa `attempt` (1 = primeira repetição).
+        """
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(0, delay) if self.jitter else delay
+
+
+    def should_retry(self, attempt, elapsed, delay):
+        """
+        Indica se ainda há tentativas e tempo para mais uma repetição.
+        """
+        return attempt < self.max_attempts and elapsed + delay <= self.max_elapsed
+
+
+class CircuitBreaker:
+    """
+    Circuito por conta de anúncio: após `failure_threshold` falhas seguidas,
+    recusa novas requisições da conta por `reset_timeout` segundos. Depois
+    disso libera uma tentativa; se der certo, o circuito volta a fechar.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=60):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = {}
+        self._opened_at = {}
+        self._lock = threading.Lock()
+
+
+    def check(self, key):
+        """
+        Raises:
+            CircuitOpenError: Se o circuito da conta estiver aberto.
+        """
+        with self._lock:
+            opened_at = self._opened_at.get(key)
+            if opened_at is None:
+                return
+            if time.monotonic() - opened_at >= self.reset_timeout:
+                # Meio-aberto: deixa passar uma tentativa
+                del self._opened_at[key]
+                self._failures[key] = self.failure_threshold - 1
+                return
+        raise CircuitOpenError(f"Circuito aberto para {key}; requisições suspensas temporariamente.")
+
+
+    def record_success(self, key):
+        with self._lock:
+            self._failures.pop(key, None)
+
+
+    def record_failure(self, key):
+        with self._lock:
+            self._failures[key] = self._failures.get(key, 0) + 1
+            if self._failures[key] >= self.failure_threshold and key not in self._opened_at:
+                self._opened_at[key] = time.monotonic()
+                logger.error(f"Circuito aberto para {key} após {self._failures[key]} falhas seguidas.")
+
+
+    def is_open(self, key):
+        with self._lock:
+            return key in self._opened_at
+
+
+class RetryStats:
+    """
+    Acumula tentativas, repetições, desistências e latências das requisições,
+    para ajustar a política de retry.
+    """
+
+    def __init__(self):
+        self.attempts = 0
+        self.retries = 0
+        self.give_ups = 0
+        self.latencies = []
+        self._lock = threading.Lock()
+
+
+    def record_attempt(self, latency):
+        with self._lock:
+            self.attempts += 1
+            self.latencies.append(latency)
+
+
+    def record_retry(self):
+        with self._lock:
+            self.retries += 1
+
+
+    def record_give_up(self):
+        with self._lock:
+            self.give_ups += 1
+
+
+    def summary(self):
+        """
+        Returns:
+            dict: Contadores e latências (segundos) p50/p95/máxima.
+        """
+        with self._lock:
+            latencies = sorted(self.latencies)
+            summary = {'attempts': self.attempts, 'retries': self.retries, 'give_ups': self.give_ups}
+        if latencies:
+            summary['latency_p50'] = statistics.median(latencies)
+            summary['latency_p95'] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            summary['latency_max'] = latencies[-1]
+        return summary
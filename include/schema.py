@@ -1,6 +1,7 @@
 # o schema do pydantic
 from pydantic import BaseModel
-from datetime import date
+from datetime import date, datetime
+from typing import Optional
 
 class CampaignCreate(BaseModel):
     spend: float
@@ -15,4 +16,9 @@ class CampaignCreate(BaseModel):
     date_stop: date
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class CampaignResponse(CampaignCreate):
+    id: int
+    created_at: Optional[datetime] = None
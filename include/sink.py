@@ -0,0 +1,120 @@
+# Saída colunar: Parquet comprimido, particionado por conta e data (hive:
+# account_id=.../date_start=...), com o schema fixado a partir do CampaignCreate.
+# Leitores podem filtrar partições e colunas sem abrir todos os arquivos.
+from datetime import date
+import logging
+import os
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from .schema import CampaignCreate
+
+# Configura o logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Tipo Arrow de cada tipo Python usado nos schemas
+ARROW_TYPES = {
+    float: pa.float32(),
+    int: pa.int32(),
+    str: pa.string(),
+    date: pa.date32(),
+}
+
+# Colunas de partição (na ordem dos diretórios)
+PARTITION_SCHEMA = pa.schema([('account_id', pa.string()), ('date_start', pa.date32())])
+
+
+def arrow_schema(schema=CampaignCreate):
+    """
+    Monta o schema Arrow a partir de um schema pydantic, mais a coluna account_id.
+    """
+    fields = [pa.field(name, ARROW_TYPES[info.annotation], nullable=False)
+              for name, info in schema.model_fields.items()]
+    return pa.schema(fields + [pa.field('account_id', pa.string(), nullable=False)])
+
+
+def write_parquet(dataframe, root_dir, account_id, mode='append', schema=CampaignCreate,
+                  compression='zstd'):
+    """
+    Grava um DataFrame como dataset Parquet particionado por conta e data.
+
+    Args:
+        dataframe (pd.DataFrame): Dados com as colunas do schema (colunas extras são ignoradas).
+        root_dir (str): Diretório raiz do dataset.
+        account_id (str): ID da conta de anúncio (partição account_id).
+        mode (str): 'append' adiciona arquivos às partições; 'overwrite' substitui
+            as partições (conta + data) presentes no DataFrame; 'merge' substitui nessas
+            partições só as linhas (campaign_id, date_start) presentes no DataFrame e
+            mantém as das demais campanhas (ex: coleta parcial).
+        schema: Schema pydantic que define colunas e tipos.
+        compression (str): Codec de compressão do Parquet.
+
+    Returns:
+        int: Quantidade de linhas gravadas.
+    """
+    if mode not in ('append', 'overwrite', 'merge'):
+        raise ValueError(f"Modo de gravação desconhecido: {mode}")
+
+    target = arrow_schema(schema)
+    columns = [name for name in target.names if name != 'account_id']
+    frame = dataframe[columns].copy()
+    for name in columns:
+        if target.field(name).type == pa.date32():
+            frame[name] = pd.to_datetime(frame[name]).dt.date
+    frame['account_id'] = str(account_id)
+
+    table = pa.Table.from_pandas(frame, schema=target, preserve_index=False)
+    if mode == 'merge':
+        table = _merge_existing(table, root_dir, account_id, target)
+    ds.write_dataset(
+        table,
+        root_dir,
+        format='parquet',
+        partitioning=ds.partitioning(PARTITION_SCHEMA, flavor='hive'),
+        # Nome único por execução, para que 'append' não sobrescreva arquivos anteriores
+        basename_template=f'part-{uuid.uuid4().hex}-{{i}}.parquet',
+        existing_data_behavior='overwrite_or_ignore' if mode == 'append' else 'delete_matching',
+        file_options=ds.ParquetFileFormat().make_write_options(compression=compression),
+    )
+    logger.info(f"{table.num_rows} linhas gravadas em Parquet em '{root_dir}' ({mode}).")
+    return table.num_rows
+
+
+def _merge_existing(table, root_dir, account_id, target):
+    """
+    Junta à tabela nova as linhas já gravadas nas mesmas partições (conta + data)
+    cujas chaves (campaign_id, date_start) não vieram nela.
+    """
+    if not os.path.isdir(root_dir) or table.num_rows == 0:
+        return table
+    dataset = ds.dataset(root_dir, format='parquet', schema=target,
+                         partitioning=ds.partitioning(PARTITION_SCHEMA, flavor='hive'))
+    existing = dataset.to_table(filter=(ds.field('account_id') == str(account_id))
+                                & ds.field('date_start').isin(pc.unique(table['date_start'])))
+    kept = existing.join(table.select(['campaign_id', 'date_start']), keys=['campaign_id', 'date_start'],
+                         join_type='left anti')
+    if kept.num_rows:
+        logger.info(f"{kept.num_rows} linhas de campanhas não recoletadas mantidas nas partições.")
+    return pa.concat_tables([kept.select(target.names).cast(target), table])
+
+
+def read_parquet(root_dir, columns=None, filter=None, schema=CampaignCreate):
+    """
+    Lê o dataset Parquet, carregando só as colunas e partições pedidas.
+
+    Args:
+        root_dir (str): Diretório raiz do dataset.
+        columns (list): Colunas a ler (padrão: todas).
+        filter: Expressão de filtro do pyarrow (ex: `ds.field('date_start') >= date(2025, 3, 1)`).
+
+    Returns:
+        pd.DataFrame: Dados lidos.
+    """
+    dataset = ds.dataset(root_dir, format='parquet', schema=arrow_schema(schema),
+                         partitioning=ds.partitioning(PARTITION_SCHEMA, flavor='hive'))
+    return dataset.to_table(columns=columns, filter=filter).to_pandas()
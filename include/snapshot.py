@@ -0,0 +1,95 @@
+# Gravação dos dados brutos da API em NDJSON (uma linha JSON por registro),
+# página por página, sem acumular a resposta inteira em memória.
+import gzip
+import json
+import logging
+import os
+
+# Configura o logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Extensão de arquivo de cada compressão suportada
+EXTENSIONS = {None: '.ndjson', 'gzip': '.ndjson.gz', 'zstd': '.ndjson.zst'}
+
+
+class NDJSONSnapshotWriter:
+    """
+    Grava páginas da Graph API em NDJSON, opcionalmente comprimido (gzip ou zstd).
+
+    O arquivo é escrito como `<destino>.partial` e só é renomeado para o nome
+    final (de forma atômica) quando o `with` termina sem erro. Cada página é
+    gravada como um bloco independente (um membro gzip / frame zstd), então
+    se a execução cair no meio o `.partial` continua legível até a última
+    página gravada.
+
+    Exemplo:
+        with NDJSONSnapshotWriter('campaigns.ndjson.gz', compression='gzip') as writer:
+            for page in api.iter_campaigns_status(ad_acc):
+                writer.write_page(page)
+    """
+
+    def __init__(self, path, compression=None):
+        if compression not in EXTENSIONS:
+            raise ValueError(f"Compressão desconhecida: {compression}")
+        self.path = path
+        self.partial_path = path + '.partial'
+        self.compression = compression
+        self.rows = 0
+        self.pages = 0
+        self._file = None
+        self._compress = self._compressor(compression)
+
+
+    def _compressor(self, compression):
+        if compression == 'gzip':
+            return gzip.compress
+        if compression == 'zstd':
+            try:
+                import zstandard
+            except ImportError as e:
+                raise ImportError("Instale o pacote `zstandard` para gravar snapshots em zstd.") from e
+            return zstandard.ZstdCompressor().compress
+        return lambda data: data
+
+
+    def __enter__(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.partial_path, 'wb')
+        return self
+
+
+    def write_page(self, rows):
+        """
+        Acrescenta as linhas de uma página ao arquivo e descarrega no disco.
+
+        Args:
+            rows (list): Registros (dicts) da página.
+        """
+        if not rows:
+            return
+        lines = ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows)
+        self._file.write(self._compress(lines.encode('utf-8')))
+        self._file.flush()
+        self.rows += len(rows)
+        self.pages += 1
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._file.close()
+        if exc_type is not None:
+            # Mantém o .partial (válido até a última página) para inspeção/retomada
+            logger.error(f"Snapshot interrompido; {self.rows} linhas mantidas em '{self.partial_path}'.")
+            return False
+        os.replace(self.partial_path, self.path)
+        logger.info(f"Snapshot com {self.rows} linhas ({self.pages} páginas) salvo em '{self.path}'.")
+        return False
+
+
+def snapshot_path(directory, dataset_name, suffix, compression=None):
+    """
+    Caminho do snapshot: `<diretório>/<dataset> <sufixo><extensão>`.
+    """
+    return os.path.join(directory, f'{dataset_name} {suffix}{EXTENSIONS[compression]}')
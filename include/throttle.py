@@ -0,0 +1,172 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+
+# Configura o logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class RateLimitThrottler:
+    """
+    Controla o ritmo das requisições à Graph API a partir dos cabeçalhos de uso
+    (`X-App-Usage`, `X-Ad-Account-Usage`, `X-Business-Use-Case-Usage` e
+    `X-FB-Ads-Insights-Throttle`) devolvidos em cada resposta.
+
+    O uso do app (`X-App-Usage`) vale para todas as requisições do token; o uso da
+    conta e do business (e o bloqueio até `estimated_time_to_regain_access`) vale só
+    para a conta da requisição que o recebeu, para que uma conta limitada não atrase
+    as demais. O uso de cada conta é substituído a cada resposta dela e esquecido
+    após `usage_ttl` segundos sem respostas.
+
+    Abaixo de `threshold`% de uso nada é atrasado; acima disso cada requisição
+    espera um tempo que cresce até `max_delay` segundos perto de 100%. Pode ser
+    compartilhado entre threads e tarefas asyncio.
+    """
+    # Um throttler por token, para que todos os clientes do mesmo app dividam o limite
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, threshold=75, max_delay=60, usage_ttl=300):
+        self.threshold = threshold
+        self.max_delay = max_delay
+        self.usage_ttl = usage_ttl
+        self.usage = {}  # último percentual de uso do app em cada métrica
+        self._app_updated = 0.0
+        self._accounts = {}  # {conta: (uso por métrica, bloqueada até, atualizado em)}
+        self._lock = threading.Lock()
+
+
+    @classmethod
+    def for_token(cls, token, **kwargs):
+        """
+        Devolve o throttler compartilhado do token informado, criando-o se necessário.
+        """
+        with cls._shared_lock:
+            if token not in cls._shared:
+                cls._shared[token] = cls(**kwargs)
+            return cls._shared[token]
+
+
+    def update(self, headers, account=None):
+        """
+        Atualiza o uso a partir dos cabeçalhos de uma resposta da Graph API.
+
+        Args:
+            headers (Mapping): Cabeçalhos HTTP da resposta.
+            account (str): Conta de anúncio da requisição (ex: a chave do circuito).
+        """
+        app_usage = {}
+        usage = {}
+        regain_seconds = 0
+
+        app = self._parse(headers, 'X-App-Usage')
+        for key in ('call_count', 'total_time', 'total_cputime'):
+            if key in app:
+                app_usage[f'app.{key}'] = float(app[key])
+
+        account_usage = self._parse(headers, 'X-Ad-Account-Usage')
+        if 'acc_id_util_pct' in account_usage:
+            usage['ad_account.acc_id_util_pct'] = float(account_usage['acc_id_util_pct'])
+        if float(account_usage.get('acc_id_util_pct', 0)) >= 100:
+            regain_seconds = max(regain_seconds, float(account_usage.get('reset_time_duration', 0)))
+
+        insights = self._parse(headers, 'X-FB-Ads-Insights-Throttle')
+        for key in ('app_id_util_pct', 'acc_id_util_pct'):
+            if key in insights:
+                usage[f'insights.{key}'] = float(insights[key])
+
+        business = self._parse(headers, 'X-Business-Use-Case-Usage')
+        for business_id, entries in business.items():
+            for entry in entries:
+                prefix = f"buc.{business_id}.{entry.get('type', '')}"
+                for key in ('call_count', 'total_time', 'total_cputime'):
+                    if key in entry:
+                        usage[f'{prefix}.{key}'] = float(entry[key])
+                # Tempo estimado (em minutos) até o acesso ser liberado
+                regain_seconds = max(regain_seconds,
+                                     float(entry.get('estimated_time_to_regain_access', 0)) * 60)
+
+        now = time.monotonic()
+        with self._lock:
+            if app_usage:
+                self.usage = app_usage
+                self._app_updated = now
+            _, blocked_until, _ = self._accounts.get(account, ({}, 0.0, now))
+            if regain_seconds:
+                blocked_until = max(blocked_until, now + regain_seconds)
+            self._accounts[account] = (usage, blocked_until, now)
+        if regain_seconds:
+            logger.warning(f"Limite de uso da API atingido ({account or 'app'}); "
+                           f"aguardando {regain_seconds:.0f}s.")
+
+
+    def _parse(self, headers, name):
+        """
+        Lê um cabeçalho JSON de uso. Retorna {} se ausente ou inválido.
+        """
+        value = headers.get(name)
+        if not value:
+            return {}
+        try:
+            return json.loads(value)
+        except ValueError:
+            logger.warning(f"Cabeçalho {name} inválido: {value}")
+            return {}
+
+
+    def _state(self, account):
+        """
+        Retorna (maior uso conhecido, segundos de bloqueio restantes) para a conta,
+        ignorando medições mais antigas que `usage_ttl`.
+        """
+        now = time.monotonic()
+        with self._lock:
+            usage = list(self.usage.values()) if now - self._app_updated <= self.usage_ttl else []
+            account_usage, blocked_until, updated = self._accounts.get(account, ({}, 0.0, 0.0))
+            if now - updated <= self.usage_ttl:
+                usage.extend(account_usage.values())
+        return max(usage, default=0.0), blocked_until - now
+
+
+    def current_usage(self, account=None):
+        """
+        Retorna o maior percentual de uso conhecido do app e da conta informada.
+        """
+        return self._state(account)[0]
+
+
+    def delay(self, account=None):
+        """
+        Calcula quantos segundos a próxima requisição da conta deve esperar.
+        """
+        usage, blocked = self._state(account)
+        if blocked > 0:
+            return blocked
+        if usage < self.threshold:
+            return 0.0
+        # Cresce de 0 (no threshold) até max_delay (em 100% de uso)
+        ratio = min((usage - self.threshold) / (100 - self.threshold), 1.0)
+        return self.max_delay * ratio ** 2
+
+
+    def wait(self, account=None):
+        """
+        Espera (bloqueando a thread) o tempo necessário antes da próxima requisição da conta.
+        """
+        seconds = self.delay(account)
+        if seconds > 0:
+            logger.info(f"Uso da API em {self.current_usage(account):.0f}%; aguardando {seconds:.1f}s.")
+            time.sleep(seconds)
+
+
+    async def wait_async(self, account=None):
+        """
+        Versão assíncrona de `wait`, que não bloqueia o event loop.
+        """
+        seconds = self.delay(account)
+        if seconds > 0:
+            logger.info(f"Uso da API em {self.current_usage(account):.0f}%; aguardando {seconds:.1f}s.")
+            await asyncio.sleep(seconds)
@@ -0,0 +1,96 @@
+# Validação em lote das linhas da Graph API com os schemas pydantic, antes da carga.
+# A API devolve números como strings ("12.34"); o modo lax do pydantic converte
+# para float/int/date. Linhas inválidas vão para a quarentena em vez de interromper a carga.
+from datetime import datetime
+from typing import TypedDict
+import logging
+import os
+
+from pydantic import TypeAdapter, ValidationError
+
+from .schema import CampaignCreate
+from .snapshot import NDJSONSnapshotWriter, snapshot_path
+
+# Configura o logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Diretório dos arquivos de quarentena (linhas rejeitadas na validação)
+QUARANTINE_DIR = os.getenv('QUARANTINE_DIR', 'quarantine')
+
+
+def rows_adapter(model):
+    """
+    Cria um TypeAdapter de lista a partir dos campos de um schema pydantic.
+
+    Os campos são copiados para um TypedDict: a página inteira é validada em uma
+    única chamada ao pydantic-core e já sai como dicts, sem criar (e depois
+    serializar) uma instância do modelo por linha. Campos extras são ignorados.
+
+    Args:
+        model (type[BaseModel]): Schema com os campos e tipos esperados.
+
+    Returns:
+        TypeAdapter: Adaptador para `list[<TypedDict do schema>]`.
+    """
+    row_type = TypedDict(model.__name__ + 'Row',
+                         {name: field.annotation for name, field in model.model_fields.items()})
+    return TypeAdapter(list[row_type])
+
+
+CAMPAIGN_ROWS = rows_adapter(CampaignCreate)
+
+
+def validate_rows(rows, adapter=CAMPAIGN_ROWS):
+    """
+    Valida e converte uma lista de linhas da API de uma só vez.
+
+    Quando há linhas inválidas, elas são separadas pelos índices dos erros e as
+    demais são validadas de novo; nenhuma exceção é lançada.
+
+    Args:
+        rows (list): Linhas (dicts) como vieram da API.
+        adapter (TypeAdapter): Adaptador de lista do schema (padrão: CampaignCreate).
+
+    Returns:
+        tuple: (linhas válidas como dicts prontos para a carga, rejeitadas). Cada
+            rejeitada é um dict com a linha original (`row`) e os erros (`errors`).
+    """
+    rows = list(rows)
+    try:
+        return adapter.validate_python(rows), []
+    except ValidationError as e:
+        errors = {}
+        for error in e.errors(include_url=False, include_input=False):
+            index, *field = error['loc']
+            errors.setdefault(index, []).append({
+                'field': '.'.join(map(str, field)),
+                'type': error['type'],
+                'msg': error['msg'],
+            })
+
+    rejects = [{'row': rows[index], 'errors': row_errors} for index, row_errors in errors.items()]
+    valid = [row for index, row in enumerate(rows) if index not in errors]
+    return adapter.validate_python(valid), rejects
+
+
+def write_quarantine(rejects, dataset_name, directory=None):
+    """
+    Grava as linhas rejeitadas em NDJSON para inspeção e reprocessamento.
+
+    Args:
+        rejects (list): Rejeitadas devolvidas por `validate_rows`.
+        dataset_name (str): Nome do conjunto de dados (usado no nome do arquivo).
+        directory (str): Diretório de destino (padrão: QUARANTINE_DIR).
+
+    Returns:
+        str: Caminho do arquivo gravado, ou None se não houver rejeitadas.
+    """
+    if not rejects:
+        return None
+    path = snapshot_path(directory or QUARANTINE_DIR, dataset_name,
+                         datetime.now().strftime('%Y-%m-%d_%H-%M-%S-%f'))
+    with NDJSONSnapshotWriter(path) as writer:
+        writer.write_page(rejects)
+    logger.warning(f"{len(rejects)} linhas rejeitadas na validação foram para a quarentena em '{path}'.")
+    return path
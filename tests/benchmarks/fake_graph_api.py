@@ -0,0 +1,197 @@
+"""
+Servidor local que imita a Graph API da Meta, para benchmarks e testes sem rede.
+
+Atende os endpoints usados pelo pipeline (campanhas, adsets, contagem de objetos,
+insights por conta e por campanha, requisições em lote), com tamanho de conta,
+tamanho de página, latência, taxa de erros e headers de rate limit configuráveis.
+
+Exemplo:
+    with FakeGraphAPI(n_campaigns=200, latency=0.005) as server:
+        api = GraphAPI("TOKEN")
+        api.base_url = server.url
+        api.get_campaigns_status("123")
+"""
+
+import json
+import random
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+API_VERSION = "v22.0"
+
+
+class FakeGraphAPI:
+    def __init__(self, n_campaigns=200, n_days=30, page_size=25, latency=0.0, error_rate=0.0,
+                 usage=10, seed=0):
+        self.n_campaigns = n_campaigns
+        self.n_days = n_days
+        self.page_size = page_size
+        self.latency = latency
+        self.error_rate = error_rate
+        self.usage = usage
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self.url = None
+
+    @property
+    def campaign_ids(self):
+        return [str(10_000 + c) for c in range(self.n_campaigns)]
+
+    def __enter__(self):
+        handler = type("Handler", (_Handler,), {"fake": self})
+        self._server = _Server(("127.0.0.1", 0), handler)
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}/{API_VERSION}/"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._server.shutdown()
+        self._server.server_close()
+
+    # ---- respostas -------------------------------------------------------
+
+    def should_fail(self):
+        with self._lock:
+            self.requests += 1
+        return self.inject_error()
+
+    def inject_error(self):
+        with self._lock:
+            failed = self.error_rate and self._random.random() < self.error_rate
+            self.errors += bool(failed)
+            return failed
+
+    def usage_headers(self, account):
+        usage = {"call_count": self.usage, "total_cputime": self.usage, "total_time": self.usage}
+        return {
+            "X-App-Usage": json.dumps(usage),
+            "X-Business-Use-Case-Usage": json.dumps(
+                {account: [{"type": "ads_insights", **usage, "estimated_time_to_regain_access": 0}]}),
+        }
+
+    def handle_get(self, path, query):
+        """
+        Returns:
+            tuple: (status HTTP, corpo em dict).
+        """
+        parts = path.strip("/").split("/")[1:]  # remove a versão
+        if len(parts) == 2 and parts[0].startswith("act_") and parts[1] in ("campaigns", "adsets"):
+            if "summary" in query:
+                return 200, {"data": [], "summary": {"total_count": self.n_campaigns}}
+            rows = [{"name": f"Campanha {c}", "status": "ACTIVE", "id": c} for c in self.campaign_ids]
+            return 200, self.paginate(path, query, rows)
+        if len(parts) == 2 and parts[1] == "insights":
+            if parts[0].startswith("act_"):
+                rows = [row for c in self.campaign_ids for row in self.insights_rows(c, query)]
+            else:
+                rows = self.insights_rows(parts[0], query)
+            return 200, self.paginate(path, query, rows)
+        return 404, {"error": {"message": f"Unknown path {path}", "type": "GraphMethodException",
+                               "code": 100}}
+
+    def handle_batch(self, form):
+        answers = []
+        for request in json.loads(form["batch"][0]):
+            # relative_url não traz a versão (ex: 10000/insights?...); handle_get espera o caminho completo
+            url = urlparse(f"/{API_VERSION}/" + request["relative_url"])
+            # Sub-requisições não contam em `requests`: o lote é uma requisição HTTP só
+            if self.inject_error():
+                answers.append({"code": 500, "body": json.dumps(transient_error())})
+                continue
+            status, body = self.handle_get(url.path, parse_qs(url.query))
+            answers.append({"code": status, "body": json.dumps(body)})
+        return answers
+
+    def insights_rows(self, campaign, query):
+        if "time_range" in query:
+            time_range = json.loads(query["time_range"][0])
+            since = date.fromisoformat(time_range["since"])
+            days = (date.fromisoformat(time_range["until"]) - since).days + 1
+        else:
+            days = self.n_days
+            since = date(2025, 3, 1)
+        index = int(campaign) % 1000
+        return [
+            {
+                "spend": f"{index * 1.5 + d:.2f}", "cpc": "0.42", "cpm": "7.10", "clicks": str(index + d),
+                "frequency": "1.07", "objective": "OUTCOME_SALES", "campaign_name": f"Campanha {campaign}",
+                "campaign_id": campaign,
+                "conversions": [{"action_type": "offsite_conversion.fb_pixel_purchase", "value": str(d % 5 + 1)}],
+                "conversion_values": [{"action_type": "offsite_conversion.fb_pixel_purchase",
+                                       "value": f"{(d % 5 + 1) * 49.9:.2f}"}],
+                "date_start": str(since + timedelta(days=d)), "date_stop": str(since + timedelta(days=d)),
+            }
+            for d in range(days)
+        ]
+
+    def paginate(self, path, query, rows):
+        offset = int(query.get("after", ["0"])[0])
+        limit = int(query.get("limit", [self.page_size])[0]) or self.page_size
+        page = {"data": rows[offset:offset + limit]}
+        if offset + limit < len(rows):
+            params = {key: values[0] for key, values in query.items()}
+            params["after"] = str(offset + limit)
+            page["paging"] = {"next": f"http://127.0.0.1:{self._server.server_address[1]}{path}?"
+                                      + urlencode(params)}
+        return page
+
+
+def transient_error():
+    return {"error": {"message": "Service temporarily unavailable", "type": "OAuthException",
+                      "code": 2, "is_transient": True}}
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Fila de conexões maior que o padrão (5), para os clientes concorrentes
+    request_queue_size = 128
+
+
+class _Handler(BaseHTTPRequestHandler):
+    fake = None
+    protocol_version = "HTTP/1.1"
+    # Sem Nagle: cabeçalhos e corpo saem juntos (evita ~40 ms de ACK atrasado por requisição)
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if self.fake.latency:
+            time.sleep(self.fake.latency)
+        if self.fake.should_fail():
+            return self.reply(500, transient_error(), url.path)
+        status, body = self.fake.handle_get(url.path, parse_qs(url.query))
+        self.reply(status, body, url.path)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length", 0))
+        form = parse_qs(self.rfile.read(length).decode("utf-8"))
+        if self.fake.latency:
+            time.sleep(self.fake.latency)
+        if "batch" in form:
+            with self.fake._lock:
+                self.fake.requests += 1
+            return self.reply(200, self.fake.handle_batch(form), url.path)
+        if self.fake.should_fail():
+            return self.reply(500, transient_error(), url.path)
+        self.reply(200, {"report_run_id": "1"}, url.path)
+
+    def reply(self, status, body, path):
+        payload = json.dumps(body).encode("utf-8")
+        account = next((part for part in path.split("/") if part.startswith("act_")), "act_0")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in self.fake.usage_headers(account.removeprefix("act_")).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
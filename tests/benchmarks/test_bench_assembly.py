@@ -0,0 +1,79 @@
+"""
+Benchmark da montagem do DataFrame de dados históricos (code/utils.py).
+
+Compara a versão antiga (conversão campo a campo e pd.concat dentro do loop)
+com `campaigns_data_to_dataframe` em 400 campanhas x 30 dias (12 mil linhas).
+As comparações de tempo e memória só rodam com RUN_BENCHMARKS=1.
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "code"))
+
+from utils import campaigns_data_to_dataframe  # noqa: E402
+
+N_CAMPAIGNS = 400
+N_DAYS = 30
+RUN_BENCHMARKS = os.getenv("RUN_BENCHMARKS") == "1"
+
+
+def make_campaigns_data():
+    """Linhas no formato devolvido pela Graph API (números como strings)."""
+    return [
+        [
+            {
+                "spend": f"{c * 1.5 + d:.2f}", "cpc": "0.42", "cpm": "7.10", "clicks": str(c + d),
+                "frequency": "1.07", "objective": "OUTCOME_SALES", "campaign_name": f"Campanha {c}",
+                "campaign_id": str(10_000 + c), "date_start": f"2025-03-{d + 1:02d}",
+                "date_stop": f"2025-03-{d + 1:02d}",
+            }
+            for d in range(N_DAYS)
+        ]
+        for c in range(N_CAMPAIGNS)
+    ]
+
+
+def legacy_campaigns_data_to_dataframe(campaigns_data):
+    """Implementação anterior, mantida aqui só como referência do benchmark."""
+    df_final = pd.DataFrame()
+    for campaign_data in campaigns_data:
+        for entry in campaign_data:
+            entry["spend"] = float(entry["spend"])
+            entry["cpc"] = float(entry["cpc"])
+            entry["cpm"] = float(entry["cpm"])
+            entry["clicks"] = int(entry["clicks"])
+            entry["frequency"] = float(entry["frequency"])
+        df_final = pd.concat([df_final, pd.DataFrame(campaign_data)], ignore_index=True)
+    return df_final
+
+
+def best_of(func, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        data = make_campaigns_data()
+        started = time.perf_counter()
+        result = func(data)
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def test_dataframe_assembly_is_faster_and_smaller():
+    legacy_time, legacy = best_of(legacy_campaigns_data_to_dataframe)
+    new_time, new = best_of(campaigns_data_to_dataframe)
+
+    legacy_mb = legacy.memory_usage(deep=True).sum() / 2**20
+    new_mb = new.memory_usage(deep=True).sum() / 2**20
+    print(f"\n{len(new)} linhas: antiga {legacy_time * 1000:.0f} ms / {legacy_mb:.1f} MB, "
+          f"nova {new_time * 1000:.0f} ms / {new_mb:.1f} MB ({legacy_time / new_time:.1f}x)")
+
+    assert len(new) == len(legacy) == N_CAMPAIGNS * N_DAYS
+    assert new["clicks"].dtype == "int32" and new["spend"].dtype == "float32"
+    assert str(new["campaign_name"].dtype) == "category"
+    assert (new["clicks"].to_numpy() == legacy["clicks"].to_numpy()).all()
+    if RUN_BENCHMARKS:
+        assert new_time * 2 < legacy_time
+        assert new_mb < legacy_mb
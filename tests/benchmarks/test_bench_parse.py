@@ -0,0 +1,62 @@
+"""
+Benchmark do parse da DAG e da importação do pacote include.
+
+O scheduler do Airflow reimporta dags/dag_api_meta.py a cada ciclo de parse, então
+o arquivo não pode carregar include/ (SQLAlchemy, requests, aiohttp...) nem criar
+engine ou clientes HTTP no nível do módulo. Cada medição roda em um processo novo,
+para não aproveitar módulos já importados por outros testes. O orçamento de tempo
+do parse só é verificado com RUN_BENCHMARKS=1.
+"""
+
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+DAG_FILE = os.path.join(ROOT, "dags", "dag_api_meta.py")
+
+# Orçamento (segundos) para executar o arquivo da DAG, com o Airflow já importado
+PARSE_BUDGET = float(os.getenv("DAG_PARSE_BUDGET", 0.5))
+RUN_BENCHMARKS = os.getenv("RUN_BENCHMARKS") == "1"
+
+
+def run_python(code):
+    result = subprocess.run(
+        [sys.executable, "-c", textwrap.dedent(code)],
+        cwd=ROOT, capture_output=True, text=True, timeout=120,
+        env={**os.environ, "URLPOSTGRES": os.getenv("URLPOSTGRES", "sqlite://")},
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout.strip()
+
+
+def test_include_import_does_not_create_engine_or_sessions():
+    out = run_python("""
+        from include import db
+        from include.controller import CampaignController
+
+        controller = CampaignController("TOKEN", "123")
+        print(db._engine is None, db._session_factory is None, controller.fb_api._session is None)
+    """)
+    assert out == "True True True"
+
+
+def test_dag_file_parses_within_budget():
+    pytest.importorskip("airflow")
+    out = run_python(f"""
+        import runpy, sys, time
+        import airflow.decorators  # custo do próprio Airflow fica fora da medição
+
+        start = time.perf_counter()
+        runpy.run_path({DAG_FILE!r})
+        elapsed = time.perf_counter() - start
+        print(elapsed, any(name.startswith("include") for name in sys.modules))
+    """)
+    elapsed, loaded_include = out.split()[-2:]
+    print(f"\\nparse de {os.path.basename(DAG_FILE)}: {float(elapsed) * 1000:.1f} ms")
+    assert loaded_include == "False"
+    if RUN_BENCHMARKS:
+        assert float(elapsed) < PARSE_BUDGET
@@ -0,0 +1,300 @@
+"""
+Benchmark de ponta a ponta do pipeline contra o servidor falso da Graph API
+(fake_graph_api.py), sem acesso à rede.
+
+Para cada etapa mede requisições/s, linhas/s, latência p50/p99 das requisições e
+pico de memória (tracemalloc), e compara com as referências em baselines.json:
+a etapa falha se ficar mais lenta ou usar mais memória que a referência além da
+tolerância (BENCH_TOLERANCE, padrão 0.5 = 50%).
+
+Por padrão só as verificações funcionais rodam (linhas extraídas, nenhuma perdida);
+as comparações de desempenho dependem da máquina e só rodam com RUN_BENCHMARKS=1:
+    RUN_BENCHMARKS=1 pytest tests/benchmarks -s
+
+Para regravar as referências na máquina atual:
+    BENCH_UPDATE_BASELINES=1 pytest tests/benchmarks/test_bench_pipeline.py -s
+"""
+
+import asyncio
+import json
+import math
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+import pytest
+
+from fake_graph_api import FakeGraphAPI
+from include.actions import normalize_actions
+from include.cache import ResponseCache
+from include.columnar import decode_pages, page_columns
+from include.extract import GraphAPI
+from include.extract_async import AsyncGraphAPI
+from include.fields import fields_for
+from include.retry import RetryPolicy
+from include.sink import write_parquet
+from include.throttle import RateLimitThrottler
+from include.validation import validate_rows
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "code"))
+
+from utils import (campaigns_data_to_dataframe, save_campaigns_historical_data,  # noqa: E402
+                   save_campaigns_historical_data_columnar)
+
+BASELINES_FILE = os.path.join(os.path.dirname(__file__), "baselines.json")
+TOLERANCE = float(os.getenv("BENCH_TOLERANCE", 0.5))
+UPDATE_BASELINES = os.getenv("BENCH_UPDATE_BASELINES") == "1"
+RUN_BENCHMARKS = os.getenv("RUN_BENCHMARKS") == "1" or UPDATE_BASELINES
+
+N_CAMPAIGNS = 100
+N_DAYS = 30
+LATENCY = 0.002  # segundos por requisição no servidor falso
+PAGE_SIZE = 25
+# Um POST por lote de 50 campanhas + as páginas seguintes de cada campanha (GET).
+# Se o lote falhasse por inteiro, seriam 2 GETs por campanha.
+BATCH_REQUESTS = math.ceil(N_CAMPAIGNS / 50) + N_CAMPAIGNS * (math.ceil(N_DAYS / PAGE_SIZE) - 1)
+
+
+@pytest.fixture(scope="module")
+def server():
+    with FakeGraphAPI(n_campaigns=N_CAMPAIGNS, n_days=N_DAYS, page_size=PAGE_SIZE, latency=LATENCY) as fake:
+        yield fake
+
+
+@pytest.fixture(scope="module")
+def history(server):
+    """Dados históricos brutos de todas as campanhas (entrada das etapas sem rede)."""
+    api = make_api(server)
+    results = api.get_data_over_time_batch(server.campaign_ids)
+    return [row for campaign in server.campaign_ids for row in results[campaign]["data"]]
+
+
+def make_api(server, cls=GraphAPI, **kwargs):
+    # Throttler e cache próprios: nada compartilhado com outros testes do processo
+    retry_policy = RetryPolicy(base_delay=0.01, max_delay=0.05, jitter=False)
+    if cls is GraphAPI:
+        kwargs["cache"] = ResponseCache()
+    api = cls("TOKEN", throttler=RateLimitThrottler(), retry_policy=retry_policy, **kwargs)
+    api.base_url = server.url
+    return api
+
+
+def measure(stage, func, api=None):
+    """
+    Executa a etapa duas vezes: uma para o tempo e outra, com tracemalloc, para o
+    pico de memória.
+
+    Args:
+        stage (str): Nome da etapa.
+        func (callable): Executa a etapa e devolve a quantidade de linhas processadas.
+        api: Cliente cujas latências (`retry_stats`) entram na medição.
+
+    Returns:
+        dict: Métricas da etapa.
+    """
+    seen = len(api.retry_stats.latencies) if api else 0
+    start = time.perf_counter()
+    rows = func()
+    seconds = time.perf_counter() - start
+    latencies = sorted(api.retry_stats.latencies[seen:]) if api else []
+
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    metrics = {
+        "seconds": round(seconds, 4),
+        "rows": rows,
+        "rows_per_s": round(rows / seconds, 1),
+        "requests": len(latencies),
+        "requests_per_s": round(len(latencies) / seconds, 1),
+        "latency_p50_ms": round(statistics.median(latencies) * 1000, 2) if latencies else None,
+        "latency_p99_ms": (round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 2)
+                           if latencies else None),
+        "peak_mb": round(peak / 2**20, 2),
+    }
+    print(f"\n{stage}: " + ", ".join(f"{key}={value}" for key, value in metrics.items()))
+    return metrics
+
+
+def counting_requests(server, func, counts):
+    """Envolve a etapa, guardando em `counts` quantas requisições HTTP cada execução fez ao servidor."""
+    def run():
+        before = server.requests
+        rows = func()
+        counts.append(server.requests - before)
+        return rows
+    return run
+
+
+def check_baseline(stage, metrics):
+    if not RUN_BENCHMARKS:
+        return
+
+    with open(BASELINES_FILE, encoding="utf-8") as f:
+        baselines = json.load(f)
+
+    if UPDATE_BASELINES:
+        baselines[stage] = {"rows_per_s": metrics["rows_per_s"], "peak_mb": metrics["peak_mb"]}
+        with open(BASELINES_FILE, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        return
+
+    baseline = baselines.get(stage)
+    if baseline is None:
+        pytest.skip(f"sem referência para {stage}; grave com BENCH_UPDATE_BASELINES=1")
+    assert metrics["rows_per_s"] >= baseline["rows_per_s"] * (1 - TOLERANCE), (
+        f"{stage}: {metrics['rows_per_s']} linhas/s, referência {baseline['rows_per_s']}")
+    # 1 MB de folga absoluta para etapas que quase não alocam
+    assert metrics["peak_mb"] <= baseline["peak_mb"] * (1 + TOLERANCE) + 1, (
+        f"{stage}: pico de {metrics['peak_mb']} MB, referência {baseline['peak_mb']} MB")
+
+
+def test_extract_campaigns_status(server):
+    def run():
+        # Cache novo a cada execução, para medir as requisições e não o cache
+        api.cache = ResponseCache()
+        return len(api.get_campaigns_status("123")["data"])
+
+    api = make_api(server)
+    metrics = measure("extract_campaigns_status", run, api)
+    assert metrics["rows"] == N_CAMPAIGNS
+    check_baseline("extract_campaigns_status", metrics)
+
+
+def test_extract_history_batch(server):
+    api = make_api(server)
+    counts = []
+    metrics = measure("extract_history_batch", counting_requests(
+        server, lambda: len(save_campaigns_historical_data(api, server.campaign_ids)), counts), api)
+    assert metrics["rows"] == N_CAMPAIGNS * N_DAYS
+    # O caminho em lote foi usado, e não a busca individual por campanha
+    assert counts == [BATCH_REQUESTS, BATCH_REQUESTS]
+    check_baseline("extract_history_batch", metrics)
+
+
+def test_extract_history_batch_columnar(server, monkeypatch):
+    # Com a mesma quantidade de requisições, o tempo é dominado pela latência e fica
+    # próximo do caminho com dicts; o ganho desta etapa é o pico de memória
+    api = make_api(server)
+    decoded = []
+    decode_batch_tables = api._decode_batch_tables
+
+    def spy(answers, *args, **kwargs):
+        decoded.append(len(answers))
+        return decode_batch_tables(answers, *args, **kwargs)
+
+    monkeypatch.setattr(api, "_decode_batch_tables", spy)
+    counts = []
+    metrics = measure("extract_history_batch_columnar", counting_requests(
+        server, lambda: len(save_campaigns_historical_data_columnar(api, server.campaign_ids)), counts), api)
+    assert metrics["rows"] == N_CAMPAIGNS * N_DAYS
+    assert counts == [BATCH_REQUESTS, BATCH_REQUESTS]
+    # As sub-respostas de cada lote são decodificadas juntas, sem busca individual
+    assert decoded == [50, 50] * 2
+    check_baseline("extract_history_batch_columnar", metrics)
+
+
+def test_extract_history_async(server):
+    api = make_api(server, AsyncGraphAPI, max_concurrency=20)
+
+    def run():
+        results = asyncio.run(api.get_campaigns_data_over_time(server.campaign_ids))
+        return sum(len(data["data"]) for data in results.values())
+
+    metrics = measure("extract_history_async", run, api)
+    assert metrics["rows"] == N_CAMPAIGNS * N_DAYS
+    check_baseline("extract_history_async", metrics)
+
+
+def test_extract_history_with_transient_errors():
+    # 5% das requisições falham com erro transitório; nenhuma linha pode se perder
+    with FakeGraphAPI(n_campaigns=N_CAMPAIGNS, n_days=N_DAYS, latency=LATENCY, error_rate=0.05) as server:
+        api = make_api(server)
+
+        def run():
+            results = api.get_data_over_time_batch(server.campaign_ids)
+            return sum(len(data["data"]) for data in results.values())
+
+        counts = []
+        metrics = measure("extract_history_with_transient_errors", counting_requests(server, run, counts), api)
+        assert server.errors > 0
+        # Só as sub-requisições e páginas com erro são repetidas; o lote continua em uso
+        assert all(BATCH_REQUESTS < count < 2 * N_CAMPAIGNS for count in counts)
+    assert metrics["rows"] == N_CAMPAIGNS * N_DAYS
+    check_baseline("extract_history_with_transient_errors", metrics)
+
+
+def test_transform(history):
+    def run():
+        rows, rejects = validate_rows(history)
+        normalize_actions(history)
+        campaigns_data_to_dataframe([rows])
+        assert rejects == []
+        return len(rows)
+
+    metrics = measure("transform", run)
+    assert metrics["rows"] == N_CAMPAIGNS * N_DAYS
+    check_baseline("transform", metrics)
+
+
+def test_decode_columnar_vs_dicts(server):
+    # Corpos das páginas como chegam da API; sem rede, só a decodificação até colunas tipadas
+    bodies = [json.dumps({"data": server.insights_rows(campaign, {})}).encode("utf-8")
+              for campaign in server.campaign_ids]
+    columns = page_columns(fields_for("campaign"))
+    api = GraphAPI("TOKEN")
+
+    def dicts():
+        pages = [api._process_conversions(json.loads(body)["data"]) for body in bodies]
+        return len(campaigns_data_to_dataframe(pages))
+
+    dict_metrics = measure("decode_dicts", dicts)
+    columnar_metrics = measure("decode_columnar", lambda: decode_pages(bodies, columns)[0].num_rows)
+    # O tracemalloc não vê os buffers do Arrow: soma o tamanho da tabela decodificada
+    arrow_mb = decode_pages(bodies, columns)[0].nbytes / 2**20
+    print(f"\ndecode_columnar: arrow_mb={arrow_mb:.2f}")
+
+    assert dict_metrics["rows"] == columnar_metrics["rows"] == N_CAMPAIGNS * N_DAYS
+    if RUN_BENCHMARKS:
+        assert columnar_metrics["rows_per_s"] > dict_metrics["rows_per_s"]
+        assert columnar_metrics["peak_mb"] + arrow_mb < dict_metrics["peak_mb"]
+    check_baseline("decode_dicts", dict_metrics)
+    check_baseline("decode_columnar", columnar_metrics)
+
+
+def test_load_parquet(history, tmp_path):
+    rows, _ = validate_rows(history)
+    df = campaigns_data_to_dataframe([rows])
+
+    def run():
+        write_parquet(df, str(tmp_path), "123", mode="overwrite")
+        return len(df)
+
+    metrics = measure("load_parquet", run)
+    check_baseline("load_parquet", metrics)
+
+
+@pytest.mark.skipif(not os.getenv("URLPOSTGRES", "").startswith("postgresql"),
+                    reason="a carga do controller precisa de PostgreSQL (URLPOSTGRES)")
+def test_controller_end_to_end(server):
+    from include.controller import CampaignController
+    from include.db import Base, get_engine
+
+    Base.metadata.create_all(get_engine())
+    controller = CampaignController("TOKEN", "123")
+    for api in (controller.fb_api, controller.async_fb_api):
+        api.base_url = server.url
+
+    def run():
+        report = controller.fetch_and_save_campaigns()
+        return sum(report.values())
+
+    metrics = measure("controller_end_to_end", run, controller.async_fb_api)
+    check_baseline("controller_end_to_end", metrics)
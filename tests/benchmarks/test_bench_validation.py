@@ -0,0 +1,58 @@
+"""
+Benchmark da validação das linhas da API antes da carga (include/validation.py).
+
+Compara `CampaignCreate.model_validate(row).model_dump()` linha a linha com a
+validação da página inteira por `validate_rows`, em 400 campanhas x 30 dias.
+A comparação de tempo só roda com RUN_BENCHMARKS=1.
+"""
+
+import os
+import time
+
+from include.schema import CampaignCreate
+from include.validation import validate_rows
+
+N_ROWS = 12_000
+RUN_BENCHMARKS = os.getenv("RUN_BENCHMARKS") == "1"
+
+
+def make_rows():
+    """Linhas no formato devolvido pela Graph API (números como strings)."""
+    return [
+        {
+            "spend": f"{i * 1.5:.2f}", "cpc": "0.42", "cpm": "7.10", "clicks": str(i % 500),
+            "frequency": "1.07", "objective": "OUTCOME_SALES", "campaign_name": f"Campanha {i % 400}",
+            "campaign_id": str(10_000 + i % 400), "date_start": f"2025-03-{i % 30 + 1:02d}",
+            "date_stop": f"2025-03-{i % 30 + 1:02d}",
+        }
+        for i in range(N_ROWS)
+    ]
+
+
+def per_row_validation(rows):
+    """Validação anterior, uma instância do modelo por linha."""
+    return [CampaignCreate.model_validate(row).model_dump() for row in rows]
+
+
+def best_of(func, rows, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(rows)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def test_batch_validation_is_faster_than_per_row():
+    rows = make_rows()
+    legacy_time, legacy = best_of(per_row_validation, rows)
+    new_time, (valid, rejects) = best_of(validate_rows, rows)
+
+    print(f"\n{N_ROWS} linhas: por linha {legacy_time * 1000:.0f} ms, "
+          f"em lote {new_time * 1000:.0f} ms ({N_ROWS / new_time:,.0f} linhas/s, "
+          f"{legacy_time / new_time:.1f}x)")
+
+    assert rejects == []
+    assert valid == legacy
+    if RUN_BENCHMARKS:
+        assert new_time * 1.5 < legacy_time
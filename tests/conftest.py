@@ -0,0 +1,6 @@
+"""Configuração comum dos testes."""
+
+import os
+
+# include.db cria o engine a partir desta variável; nos testes usamos um SQLite em memória
+os.environ.setdefault("URLPOSTGRES", "sqlite://")
@@ -0,0 +1,45 @@
+"""Testes da normalização das ações/conversões em formato longo."""
+
+from datetime import date
+
+from include.actions import ACTION_COLUMNS, normalize_actions
+from include.fields import fields_for
+
+
+def test_action_lists_are_exploded_into_long_rows():
+    rows = [
+        {"campaign_id": "1", "date_start": "2025-03-01",
+         "conversions": [{"action_type": "purchase", "value": "3"}, {"action_type": "lead", "value": "2"}],
+         "conversion_values": [{"action_type": "purchase", "value": "120.50"}],
+         "actions": [{"action_type": "link_click", "value": "40"}]},
+        {"campaign_id": "2", "date_start": "2025-03-01"},  # sem conversões
+        {"campaign_id": "3", "date_start": "2025-03-02",
+         "conversions": [{"action_type": "purchase", "value": "n/a"}]},
+    ]
+
+    df = normalize_actions(rows)
+    assert list(df.columns) == ACTION_COLUMNS
+    assert df.to_dict("records") == [
+        {"campaign_id": "1", "date_start": date(2025, 3, 1), "metric": "conversions",
+         "action_type": "purchase", "value": 3.0},
+        {"campaign_id": "1", "date_start": date(2025, 3, 1), "metric": "conversions",
+         "action_type": "lead", "value": 2.0},
+        {"campaign_id": "1", "date_start": date(2025, 3, 1), "metric": "conversion_values",
+         "action_type": "purchase", "value": 120.5},
+    ]
+    assert str(df["action_type"].dtype) == "category"
+
+    # `actions` só entra quando pedido
+    with_actions = normalize_actions(rows, metrics=("conversions", "actions"))
+    assert set(with_actions["metric"]) == {"conversions", "actions"}
+
+
+def test_page_without_actions_returns_empty_table():
+    df = normalize_actions([{"campaign_id": "1", "date_start": "2025-03-01"}])
+    assert df.empty and list(df.columns) == ACTION_COLUMNS
+
+
+def test_actions_field_is_only_requested_explicitly():
+    assert "actions" not in fields_for("campaign")
+    assert fields_for("campaign", ["campaign_id", "conversions", "actions"]) == [
+        "campaign_id", "conversions", "actions"]
@@ -0,0 +1,66 @@
+"""Testes dos breakdowns: parâmetros da consulta, codificação e ids do dicionário."""
+
+from datetime import date
+
+import pytest
+
+from include import loader
+from include.breakdowns import encode_breakdowns
+from include.extract import GraphAPI
+from include.fields import breakdowns_for
+
+
+def api_rows():
+    return [
+        {"campaign_id": "1", "date_start": "2025-03-01", "age": "18-24", "gender": "male",
+         "spend": "1.50", "clicks": "3", "cpc": "0.50", "cpm": "7.00"},
+        {"campaign_id": "1", "date_start": "2025-03-01", "age": "18-24", "gender": "female",
+         "spend": "2.50", "clicks": "1"},
+        {"campaign_id": "2", "date_start": "2025-03-02", "age": "25-34", "gender": "female",
+         "spend": "0", "clicks": "0"},
+    ]
+
+
+def test_breakdowns_are_expanded_and_validated():
+    assert breakdowns_for("placement") == ["publisher_platform", "platform_position"]
+    assert breakdowns_for(["age", "gender", "age"]) == ["age", "gender"]
+    with pytest.raises(ValueError):
+        breakdowns_for(["idade"])
+
+
+def test_insights_url_with_breakdowns_and_daily_range():
+    url = GraphAPI("TOKEN")._insights_url("123", "campaign", ["campaign_id", "spend"],
+                                          breakdowns="hourly",
+                                          time_range=(date(2025, 3, 1), date(2025, 3, 3)))
+    assert "&breakdowns=hourly_stats_aggregated_by_advertiser_time_zone" in url
+    assert "time_range=%7B%22since%22%3A%222025-03-01%22" in url and url.endswith("&time_increment=1")
+
+
+def test_dimensions_are_dictionary_encoded():
+    df = encode_breakdowns(api_rows(), ["age", "gender"])
+    assert list(df["age"].cat.categories) == ["18-24", "25-34"]
+    assert df["gender"].cat.codes.dtype == "int8"
+    assert df["spend"].tolist() == [1.5, 2.5, 0.0] and df["clicks"].dtype == "int64"
+    assert df["date_start"][0] == date(2025, 3, 1)
+
+    with pytest.raises(ValueError):
+        encode_breakdowns(api_rows(), ["age", "gender", "country"])
+
+
+def test_facts_reference_dictionary_ids(monkeypatch):
+    monkeypatch.setattr(loader, "_breakdown_value_ids", {
+        ("age", "18-24"): 1, ("age", "25-34"): 2, ("gender", "female"): 3, ("gender", "male"): 4})
+    executed = []
+
+    class FakeDB:
+        def execute(self, stmt):
+            executed.append(stmt.compile().params)
+            return type("Result", (), {"rowcount": 3})
+
+    written = loader.upsert_campaign_breakdowns(FakeDB(), encode_breakdowns(api_rows(), ["age", "gender"]),
+                                                ["age", "gender"])
+    assert written == 3
+    params = executed[0]
+    assert [params[f"dimension_1_id_m{i}"] for i in range(3)] == [1, 1, 2]
+    assert [params[f"dimension_2_id_m{i}"] for i in range(3)] == [4, 3, 3]
+    assert params["cpc_m1"] is None
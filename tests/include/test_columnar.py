@@ -0,0 +1,114 @@
+"""Testes da decodificação colunar das páginas de insights."""
+
+import json
+from datetime import date
+
+import pyarrow as pa
+import pytest
+
+from include.columnar import CATEGORY, concat_pages, decode_page, page_columns
+from include.extract import GraphAPI
+
+from test_extract import FakeSession
+
+COLUMNS = page_columns(["spend", "clicks", "campaign_name", "campaign_id", "conversions"])
+
+
+def page(rows, next_url=None):
+    body = {"data": rows}
+    if next_url:
+        body["paging"] = {"cursors": {"after": "x"}, "next": next_url}
+    return json.dumps(body).encode("utf-8")
+
+
+def test_page_is_decoded_into_typed_columns():
+    rows = [
+        {"spend": "12.50", "clicks": "7", "campaign_name": "Black Friday", "campaign_id": "1",
+         "conversions": [{"action_type": "purchase", "value": "3"}, {"action_type": "lead", "value": "1"}],
+         "date_start": "2025-03-01", "date_stop": "2025-03-01", "extra": {"ignored": True}},
+        {"spend": "0", "clicks": "0", "campaign_name": "Black Friday", "campaign_id": "1",
+         "date_start": "2025-03-02", "date_stop": "2025-03-02"},  # sem conversões
+    ]
+
+    table, next_url = decode_page(page(rows, "https://graph/next"), COLUMNS)
+
+    assert next_url == "https://graph/next"
+    assert table.column_names == COLUMNS + ["conversion"]
+    assert table.schema.field("spend").type == pa.float32()
+    assert table.schema.field("clicks").type == pa.int32()
+    assert table.schema.field("campaign_name").type == CATEGORY
+    assert table.column("date_start").to_pylist() == [date(2025, 3, 1), date(2025, 3, 2)]
+    assert table.column("spend").to_pylist() == [12.5, 0.0]
+    # `conversion` segue `_process_conversions`: valor da primeira conversão
+    assert table.column("conversion").to_pylist() == [3.0, None]
+
+
+def test_last_page_and_missing_fields():
+    table, next_url = decode_page(page([{"spend": "1.5"}]), COLUMNS)
+
+    assert next_url is None
+    assert table.num_rows == 1
+    assert table.column("campaign_id").to_pylist() == [None]
+
+
+def test_invalid_value_raises():
+    with pytest.raises(pa.ArrowInvalid):
+        decode_page(page([{"spend": "n/a"}]), COLUMNS)
+
+
+def test_pages_are_concatenated_with_unified_categories():
+    first, _ = decode_page(page([{"campaign_name": "A"}, {"campaign_name": "B"}]), COLUMNS)
+    second, _ = decode_page(page([{"campaign_name": "B"}]), COLUMNS)
+
+    df = concat_pages([first, second], COLUMNS).to_pandas()
+    assert list(df["campaign_name"]) == ["A", "B", "B"]
+    assert str(df["campaign_name"].dtype) == "category"
+    assert concat_pages([], COLUMNS).num_rows == 0
+
+
+def test_batch_columnar_follows_pages_and_retries_failed_sub_requests():
+    session = FakeSession()
+
+    def batch_answer(batch):
+        answers = []
+        for sub in batch:
+            campaign = sub["relative_url"].split("/")[0]
+            if campaign == "c2":
+                answers.append(None)  # sub-requisição que estourou o tempo limite
+            else:
+                next_url = "page-1" if campaign == "c1" else None
+                body = page([{"campaign_id": campaign, "spend": "1.0"}], next_url)
+                answers.append({"code": 200, "body": body.decode("utf-8")})
+        return answers
+
+    session.batch_answer = batch_answer
+    session.pages = {"page-0": {"data": [{"campaign_id": "c2", "spend": "2.0"}]},
+                     "page-1": {"data": [{"campaign_id": "c1", "spend": "3.0"}]}}
+    api = GraphAPI("TOKEN", session=session)
+
+    results = api.get_campaigns_data_over_time(["c1", "c2", "c3"], batch_size=50, columnar=True)
+
+    assert results["c1"].column("spend").to_pylist() == [1.0, 3.0]
+    assert results["c2"].column("spend").to_pylist() == [2.0]
+    assert results["c3"].column("campaign_id").to_pylist() == ["c3"]
+    assert results["c1"].schema.field("campaign_name").type == CATEGORY
+
+
+def test_batch_with_invalid_value_is_retried_individually():
+    session = FakeSession()
+
+    def batch_answer(batch):
+        spend = {"c1": "1.0", "c2": "n/a"}
+        return [{"code": 200, "body": page([{"spend": spend[sub["relative_url"].split("/")[0]]}]).decode("utf-8")}
+                for sub in batch]
+
+    session.batch_answer = batch_answer
+    session.pages = {"page-0": {"data": [{"spend": "5.0"}]}}
+    api = GraphAPI("TOKEN", session=session)
+
+    results = api.get_data_over_time_batch(["c1", "c2"], columnar=True)
+
+    assert results["c1"].column("spend").to_pylist() == [5.0]
+    assert results["c2"].column("spend").to_pylist() == [5.0]
+    # o lote e uma requisição individual por campanha
+    assert len(session.calls) == 3
@@ -0,0 +1,119 @@
+"""Testes da orquestração da carga no CampaignController, sem API nem PostgreSQL."""
+
+from datetime import date
+
+import pytest
+
+from include import controller as controller_module
+from include.controller import CampaignController
+
+
+def history_row(campaign, day):
+    return {"spend": "10.5", "cpc": "0.5", "cpm": "7.1", "objective": "OUTCOME_SALES",
+            "clicks": "21", "campaign_name": f"Campanha {campaign}", "campaign_id": campaign,
+            "frequency": "1.1", "date_start": day, "date_stop": day}
+
+
+@pytest.fixture
+def fake_load(monkeypatch):
+    """Substitui a API e as funções de banco; devolve os watermarks avançados por conta."""
+    watermarks = {}
+
+    def fetch(self, campaign_ids, time_ranges=None):
+        return {campaign: {"data": [history_row(campaign, "2025-03-01"), history_row(campaign, "2025-03-02")]}
+                for campaign in campaign_ids}
+
+    def upsert_campaigns(db, rows):
+        if rows and rows[0]["campaign_id"].startswith("111"):
+            raise RuntimeError("falha no banco")
+        return {"inserted": len(rows), "updated": 0, "unchanged": 0}
+
+    monkeypatch.setattr(CampaignController, "get_active_campaign_chunks",
+                        lambda self: [[f"{self.ad_acc_id}-1", f"{self.ad_acc_id}-2"]])
+    monkeypatch.setattr(CampaignController, "fetch_campaigns_data_over_time", fetch)
+    monkeypatch.setattr(controller_module, "get_time_ranges",
+                        lambda db, ad_acc_id, campaign_ids: {c: (date(2025, 3, 1), date(2025, 3, 31))
+                                                             for c in campaign_ids})
+    monkeypatch.setattr(controller_module, "upsert_campaigns", upsert_campaigns)
+    monkeypatch.setattr(controller_module, "upsert_campaign_actions",
+                        lambda db, actions, reloaded, metrics: len(actions))
+    monkeypatch.setattr(controller_module, "advance_watermarks",
+                        lambda db, ad_acc_id, last_dates: watermarks.setdefault(ad_acc_id, {}).update(last_dates))
+    return watermarks
+
+
+def test_failing_account_is_reported_and_others_still_load(fake_load):
+    results = CampaignController.ingest_accounts("TOKEN", ["111", "222"], max_workers=2)
+
+    assert results["111"]["status"] == "error"
+    assert results["111"]["report"] is None
+    assert "falha no banco" in results["111"]["error"]
+    assert results["222"]["status"] == "ok"
+    assert results["222"]["report"] == {"inserted": 4, "updated": 0, "unchanged": 0}
+
+
+def test_failed_load_is_raised_to_the_caller(fake_load):
+    controller = CampaignController("TOKEN", "111")
+    with pytest.raises(RuntimeError):
+        controller.fetch_and_save_campaigns_history(["111-1"])
+
+
+def test_watermark_advances_to_the_last_validated_day(fake_load, monkeypatch):
+    def fetch(self, campaign_ids, time_ranges=None):
+        invalid = dict(history_row("222-1", "2025-03-03"), spend="n/a")
+        return {"222-1": {"data": [history_row("222-1", "2025-03-01"), history_row("222-1", "2025-03-02"), invalid]},
+                "222-2": {"data": []},
+                "222-3": None}
+
+    monkeypatch.setattr(CampaignController, "fetch_campaigns_data_over_time", fetch)
+    monkeypatch.setattr(controller_module, "write_quarantine", lambda rejects, source: None)
+
+    CampaignController("TOKEN", "222").fetch_and_save_campaigns_history(["222-1", "222-2", "222-3"])
+
+    # nem o fim do intervalo pedido (31/03) nem o dia rejeitado na validação (03/03)
+    assert fake_load["222"] == {"222-1": date(2025, 3, 2)}
+
+
+def test_partitions_are_prepared_for_the_whole_load_window(monkeypatch):
+    ranges = []
+    monkeypatch.setattr(controller_module, "ensure_partitions",
+                        lambda db, first_day, last_day: ranges.append((first_day, last_day)))
+    controller = CampaignController("TOKEN", "111")
+
+    monkeypatch.setattr(controller_module, "CAMPAIGN_PARTITIONED", False)
+    assert controller.prepare_partitions(today=date(2025, 3, 31)) == []
+    assert ranges == []
+
+    monkeypatch.setattr(controller_module, "CAMPAIGN_PARTITIONED", True)
+    monkeypatch.setattr(controller_module, "LOOKBACK_DAYS", 30)
+    controller.prepare_partitions(today=date(2025, 3, 31))
+    assert ranges == [(date(2025, 3, 1), date(2025, 3, 31))]
+
+
+def test_account_whose_controller_cannot_be_created_is_reported(fake_load, monkeypatch):
+    original_init = CampaignController.__init__
+
+    def init(self, fb_api_token, ad_acc_id, **kwargs):
+        if ad_acc_id == "111":
+            raise OSError("sem permissão para criar o diretório do cache")
+        original_init(self, fb_api_token, ad_acc_id, **kwargs)
+
+    monkeypatch.setattr(CampaignController, "__init__", init)
+
+    results = CampaignController.ingest_accounts("TOKEN", ["111", "222"], max_workers=2)
+
+    assert results["111"]["status"] == "error"
+    assert "cache" in results["111"]["error"]
+    assert results["111"]["metrics"]["counters"] == {}
+    assert results["222"]["status"] == "ok"
+
+
+def test_failed_account_discovery_is_raised(monkeypatch):
+    monkeypatch.setattr(controller_module.GraphAPI, "get_ad_accounts", lambda self, business=None: None)
+
+    with pytest.raises(RuntimeError):
+        CampaignController.ingest_accounts("TOKEN")
+
+    # Token sem contas não é erro
+    monkeypatch.setattr(controller_module.GraphAPI, "get_ad_accounts", lambda self, business=None: [])
+    assert CampaignController.ingest_accounts("TOKEN") == {}
@@ -0,0 +1,345 @@
+"""Testes da paginação do GraphAPI, sem acessar a API real."""
+
+import json
+import time
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+from include.cache import ResponseCache
+from include.extract import GraphAPI
+from include.retry import CircuitBreaker, RetryPolicy
+from include.schema import CampaignCreate
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200, headers=None):
+        self.payload = payload
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = json.dumps(payload).encode("utf-8")
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error")
+
+    def json(self):
+        return self.payload
+
+
+def make_pages(n_pages, rows_per_page):
+    """Monta um dicionário url -> payload encadeado por `paging.next`."""
+    pages = {}
+    for p in range(n_pages):
+        url = f"page-{p}"
+        payload = {"data": [{"id": f"{p}-{r}", "status": "ACTIVE"} for r in range(rows_per_page)]}
+        if p < n_pages - 1:
+            payload["paging"] = {"next": f"page-{p + 1}"}
+        pages[url] = payload
+    return pages
+
+
+class FakeSession:
+    """Sessão falsa que responde a partir de um dicionário url -> payload."""
+
+    def __init__(self, pages=None, status_code=200):
+        self.pages = pages or {}
+        self.status_code = status_code
+        self.calls = []
+        self.closed = False
+
+    def get(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        key = "page-0" if url.endswith("&access_token=TOKEN") else url
+        return FakeResponse(self.pages.get(key, {}), self.status_code)
+
+    def post(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        return FakeResponse(self.batch_answer(json.loads(kwargs["data"]["batch"])))
+
+    def request(self, method, url, **kwargs):
+        return self.get(url, **kwargs) if method == "GET" else self.post(url, **kwargs)
+
+    def close(self):
+        self.closed = True
+
+
+def test_iter_pages_follows_next_cursor_lazily():
+    session = FakeSession(make_pages(3, 2))
+    api = GraphAPI("TOKEN", session=session)
+    calls = session.calls
+
+    iterator = api.iter_campaigns_status("123")
+    first = next(iterator)
+    assert [row["id"] for row in first] == ["0-0", "0-1"]
+    assert len(calls) == 1  # a segunda página ainda não foi pedida
+
+    rest = list(iterator)
+    assert len(rest) == 2
+    assert [url for url, _ in calls[1:]] == ["page-1", "page-2"]
+
+
+def test_get_campaigns_status_returns_every_page():
+    api = GraphAPI("TOKEN", session=FakeSession(make_pages(4, 3)))
+
+    data = api.get_campaigns_status("123")
+    assert len(data["data"]) == 12
+
+
+def test_get_insights_returns_none_on_http_error(monkeypatch):
+    monkeypatch.setattr(time, "sleep", lambda seconds: None)
+    api = GraphAPI("TOKEN", session=FakeSession(status_code=500))
+    assert api.get_insights("123") is None
+
+
+def test_endpoints_share_session_and_use_their_timeouts():
+    session = FakeSession(make_pages(1, 1))
+    api = GraphAPI("TOKEN", session=session, timeouts={"adsets": (1, 2)})
+
+    api.get_insights("123", async_report=False)
+    api.get_adset_status("123")
+
+    assert [kwargs["timeout"] for _, kwargs in session.calls] == [(5, 120), (1, 2)]
+
+
+def test_context_manager_closes_only_owned_session():
+    external = FakeSession()
+    with GraphAPI("TOKEN", session=external):
+        pass
+    assert not external.closed
+
+    with GraphAPI("TOKEN") as api:
+        assert isinstance(api.session, requests.Session)
+        owned = api.session = FakeSession()
+    assert owned.closed
+
+
+def test_batch_demultiplexes_and_retries_failed_sub_requests():
+    session = FakeSession()
+
+    def batch_answer(batch):
+        answers = []
+        for sub in batch:
+            campaign = sub["relative_url"].split("/")[0]
+            if campaign == "c2":
+                answers.append(None)  # sub-requisição que estourou o tempo limite
+            else:
+                body = {"data": [{"campaign_id": campaign, "conversions": [{"value": "3"}]}]}
+                answers.append({"code": 200, "body": json.dumps(body)})
+        return answers
+
+    session.batch_answer = batch_answer
+    session.pages = {"page-0": {"data": [{"campaign_id": "c2"}]}}
+    api = GraphAPI("TOKEN", session=session)
+
+    results = api.get_campaigns_data_over_time(["c1", "c2", "c3"], batch_size=2)
+
+    assert results["c1"]["data"][0]["conversion"] == 3.0
+    assert results["c2"] == {"data": [{"campaign_id": "c2"}]}
+    assert results["c3"]["data"][0]["campaign_id"] == "c3"
+    # dois lotes (2 + 1 campanhas) e uma requisição individual para c2
+    assert [kwargs.get("data") is not None for _, kwargs in session.calls] == [True, False, True]
+
+
+def test_large_account_switches_to_async_report(monkeypatch):
+    monkeypatch.setattr(time, "sleep", lambda seconds: None)
+    statuses = iter(["Job Not Started", "Job Running", "Job Completed"])
+
+    class ReportSession(FakeSession):
+        def get(self, url, **kwargs):
+            self.calls.append((url, kwargs))
+            if "summary=total_count" in url:
+                return FakeResponse({"data": [], "summary": {"total_count": 20000}})
+            if "async_status" in url:
+                return FakeResponse({"async_status": next(statuses)})
+            if url.startswith("https://graph.facebook.com/v22.0/run-1/insights"):
+                return FakeResponse({"data": [{"ad_id": "1"}], "paging": {"next": "page-1"}})
+            return FakeResponse({"data": [{"ad_id": "2"}]})
+
+        def post(self, url, **kwargs):
+            self.calls.append((url, kwargs))
+            return FakeResponse({"report_run_id": "run-1"})
+
+    api = GraphAPI("TOKEN", session=ReportSession())
+
+    data = api.get_insights("123", level="ad")
+
+    assert [row["ad_id"] for row in data["data"]] == ["1", "2"]
+
+
+def test_failed_async_report_returns_none(monkeypatch):
+    monkeypatch.setattr(time, "sleep", lambda seconds: None)
+
+    class FailedReportSession(FakeSession):
+        def get(self, url, **kwargs):
+            return FakeResponse({"async_status": "Job Failed"})
+
+        def post(self, url, **kwargs):
+            return FakeResponse({"report_run_id": "run-1"})
+
+    api = GraphAPI("TOKEN", session=FailedReportSession())
+
+    assert api.get_insights("123", level="ad", async_report=True) is None
+
+
+def test_transient_errors_are_retried_with_backoff(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(time, "sleep", sleeps.append)
+    answers = iter([
+        FakeResponse({"error": {"code": 17, "message": "User request limit reached"}}, 400),
+        FakeResponse({"error": {"code": 2}}, 503),
+        FakeResponse({"data": [{"id": "1"}]}),
+    ])
+
+    class FlakySession(FakeSession):
+        def get(self, url, **kwargs):
+            return next(answers)
+
+    api = GraphAPI("TOKEN", session=FlakySession(),
+                   retry_policy=RetryPolicy(base_delay=2, jitter=False))
+
+    assert api.get_adset_status("123") == {"data": [{"id": "1"}]}
+    assert sleeps == [2, 4]
+    assert api.retry_stats.summary()["attempts"] == 3
+    assert api.retry_stats.summary()["retries"] == 2
+
+
+def test_non_retryable_error_is_not_repeated():
+    session = FakeSession({"page-0": {"error": {"code": 100, "message": "Invalid parameter"}}},
+                          status_code=400)
+    api = GraphAPI("TOKEN", session=session)
+
+    assert api.get_adset_status("123") is None
+    assert len(session.calls) == 1
+
+
+def test_circuit_opens_for_failing_account(monkeypatch):
+    monkeypatch.setattr(time, "sleep", lambda seconds: None)
+    session = FakeSession(status_code=500)
+    api = GraphAPI("TOKEN", session=session, retry_policy=RetryPolicy(max_attempts=2),
+                   circuit_breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+
+    for _ in range(3):
+        assert api.get_adset_status("123") is None
+
+    # duas chamadas com 2 tentativas cada; a terceira nem chega a ser enviada
+    assert len(session.calls) == 4
+    assert api.circuit_breaker.is_open("act_123")
+    assert not api.circuit_breaker.is_open("act_456")
+
+
+def test_campaign_and_batch_requests_use_the_account_circuit(monkeypatch):
+    monkeypatch.setattr(time, "sleep", lambda seconds: None)
+    class FailingSession(FakeSession):
+        def post(self, url, **kwargs):
+            self.calls.append((url, kwargs))
+            return FakeResponse({}, 500)
+
+    session = FailingSession(status_code=500)
+    api = GraphAPI("TOKEN", session=session, retry_policy=RetryPolicy(max_attempts=1),
+                   circuit_breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+
+    # URLs de campanha e o POST em lote não trazem a conta; a chave vem de `ad_acc`
+    assert api.get_data_over_time_batch(["c1"], ad_acc="123") == {"c1": None}
+    assert api.circuit_breaker.is_open("act_123")
+    assert not api.circuit_breaker.is_open("default")
+
+    # Com o circuito aberto, a conta não envia mais nada; outras contas seguem
+    calls = len(session.calls)
+    assert api.get_data_over_time("c3", ad_acc="123") is None
+    assert len(session.calls) == calls
+    api.get_data_over_time("c4", ad_acc="456")
+    assert len(session.calls) == calls + 1
+
+
+def test_fields_are_projected_by_level_and_consumer():
+    session = FakeSession(make_pages(1, 1))
+    api = GraphAPI("TOKEN", session=session)
+
+    api.get_insights("123", level="campaign", async_report=False)
+    api.get_data_over_time("456", fields=CampaignCreate)
+
+    campaign_fields = parse_qs(urlparse(session.calls[0][0]).query)["fields"][0].split(",")
+    assert "ad_name" not in campaign_fields and "adset_id" not in campaign_fields
+    assert "campaign_id" in campaign_fields
+
+    schema_fields = parse_qs(urlparse(session.calls[1][0]).query)["fields"][0].split(",")
+    assert schema_fields == ["spend", "cpc", "cpm", "objective", "clicks",
+                             "campaign_name", "campaign_id", "frequency"]
+
+
+def test_metadata_lookups_are_served_from_cache(tmp_path):
+    session = FakeSession(make_pages(2, 1))
+    cache = ResponseCache(directory=str(tmp_path))
+    api = GraphAPI("TOKEN", session=session, cache=cache)
+
+    first = api.get_campaigns_status("123")
+    second = api.get_campaigns_status("123")
+    api.get_adset_status("123")
+    assert first == second
+    assert len(session.calls) == 4  # 2 páginas de campanhas + 2 de adsets
+    assert cache.stats["hits"] == 2
+
+    # Outro processo com o mesmo diretório também aproveita as entradas
+    other_session = FakeSession(make_pages(2, 1))
+    other = GraphAPI("TOKEN", session=other_session, cache=ResponseCache(directory=str(tmp_path)))
+    assert other.get_campaigns_status("123") == first
+    assert other_session.calls == []
+
+
+def test_cached_pages_on_disk_do_not_contain_the_token(tmp_path):
+    # Como na API real, a URL de `paging.next` traz o token
+    next_url = "https://graph/act_123/campaigns?fields=name&access_token=TOKEN&limit=1&after=c1"
+    session = FakeSession({"page-0": {"data": [{"id": "1", "status": "ACTIVE"}],
+                                      "paging": {"cursors": {"after": "c1"}, "next": next_url}},
+                           next_url: {"data": [{"id": "2", "status": "ACTIVE"}]}})
+    api = GraphAPI("TOKEN", session=session, cache=ResponseCache(directory=str(tmp_path)))
+
+    first = api.get_campaigns_status("123")
+    assert len(first["data"]) == 2
+
+    files = list(tmp_path.iterdir())
+    assert len(files) == 2
+    contents = [path.read_text(encoding="utf-8") for path in files]
+    assert not any("access_token=TOKEN" in content for content in contents)
+    assert any(f"access_token={GraphAPI.token_placeholder}" in content for content in contents)
+
+    # As páginas lidas do disco voltam com o token, nas mesmas URLs (mesmas chaves do cache)
+    other_session = FakeSession()
+    other = GraphAPI("TOKEN", session=other_session, cache=ResponseCache(directory=str(tmp_path)))
+    assert other.get_campaigns_status("123") == first
+    assert other_session.calls == []
+
+
+def test_expired_entry_is_revalidated_with_etag():
+    class ETagSession(FakeSession):
+        def get(self, url, **kwargs):
+            self.calls.append((url, kwargs))
+            if (kwargs.get("headers") or {}).get("If-None-Match") == "v1":
+                return FakeResponse(None, 304)
+            return FakeResponse({"data": [{"id": "1"}]}, headers={"ETag": "v1"})
+
+    session = ETagSession()
+    cache = ResponseCache(ttls={"adsets": 0.01})
+    api = GraphAPI("TOKEN", session=session, cache=cache)
+
+    api.get_adset_status("123")
+    time.sleep(0.02)
+
+    assert api.get_adset_status("123") == {"data": [{"id": "1"}]}
+    assert cache.stats["revalidated"] == 1
+    assert session.calls[1][1]["headers"] == {"If-None-Match": "v1"}
+
+
+def test_get_ad_accounts_keeps_only_active_accounts():
+    session = FakeSession({
+        "page-0": {"data": [
+            {"account_id": "1", "name": "A", "account_status": 1},
+            {"account_id": "2", "name": "B", "account_status": 2},
+            {"account_id": "3", "name": "C", "account_status": 1},
+        ]},
+    })
+    api = GraphAPI("TOKEN", session=session, cache=ResponseCache())
+    assert api.get_ad_accounts() == ["1", "3"]
+    assert "/me/adaccounts?" in session.calls[0][0]
+    assert "owned_ad_accounts" in api._ad_accounts_url("999")
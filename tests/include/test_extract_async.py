@@ -0,0 +1,67 @@
+"""Testes do AsyncGraphAPI contra um servidor aiohttp local."""
+
+import asyncio
+
+from aiohttp import web
+
+from include.extract_async import AsyncGraphAPI
+
+
+def run_with_server(handler, coro_factory):
+    """Sobe um servidor local, executa a corrotina e derruba o servidor."""
+
+    async def main():
+        app = web.Application()
+        app.router.add_get("/{tail:.*}", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            return await coro_factory(f"http://127.0.0.1:{port}/")
+        finally:
+            await runner.cleanup()
+
+    return asyncio.run(main())
+
+
+def test_get_campaigns_data_over_time_respects_concurrency_limit():
+    in_flight = {"now": 0, "max": 0}
+
+    async def handler(request):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        campaign = request.path.strip("/").split("/")[0]
+        return web.json_response({"data": [{"campaign_id": campaign, "spend": "1.0",
+                                            "conversions": [{"value": "2"}]}]})
+
+    async def scenario(base_url):
+        api = AsyncGraphAPI("TOKEN", max_concurrency=3)
+        api.base_url = base_url
+        return await api.get_campaigns_data_over_time([str(i) for i in range(12)])
+
+    results = run_with_server(handler, scenario)
+
+    assert list(results) == [str(i) for i in range(12)]
+    assert results["5"]["data"][0]["campaign_id"] == "5"
+    assert results["5"]["data"][0]["conversion"] == 2.0
+    assert 1 < in_flight["max"] <= 3
+
+
+def test_failed_campaign_returns_none_without_affecting_others():
+    async def handler(request):
+        if request.path.startswith("/bad"):
+            return web.json_response({"error": {"code": 100}}, status=400)
+        return web.json_response({"data": []})
+
+    async def scenario(base_url):
+        api = AsyncGraphAPI("TOKEN")
+        api.base_url = base_url
+        return await api.get_campaigns_data_over_time(["ok", "bad"])
+
+    results = run_with_server(handler, scenario)
+
+    assert results == {"ok": {"data": []}, "bad": None}
@@ -0,0 +1,133 @@
+"""Testes da carga em lote (INSERT ... ON CONFLICT) compilada para o PostgreSQL, sem banco."""
+
+from datetime import date
+
+import pandas as pd
+from sqlalchemy.dialects import postgresql
+
+from include import loader
+
+
+def campaign_row(campaign, day, spend=10.5):
+    return {"spend": spend, "cpc": 0.5, "cpm": 7.1, "objective": "OUTCOME_SALES", "clicks": 21,
+            "campaign_name": f"Campanha {campaign}", "campaign_id": campaign, "frequency": 1.1,
+            "date_start": date(2025, 3, day), "date_stop": date(2025, 3, day)}
+
+
+class FakeResult:
+    def __init__(self, written):
+        self.written = written
+        self.rowcount = len(written)
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.written
+
+
+class FakeDB:
+    """Compila cada comando para o PostgreSQL e devolve as linhas de `returned`, uma lista por comando."""
+
+    def __init__(self, returned=()):
+        self.returned = list(returned)
+        self.executed = []
+
+    def execute(self, stmt):
+        self.executed.append(stmt.compile(dialect=postgresql.dialect()))
+        return FakeResult(self.returned.pop(0) if self.returned else [])
+
+
+def test_upsert_statement_dedupes_keys_and_skips_unchanged_rows():
+    db = FakeDB()
+    rows = [campaign_row("1", 1, spend=1.0), campaign_row("1", 2), campaign_row("1", 1, spend=2.0)]
+
+    loader.upsert_campaigns(db, rows)
+
+    [compiled] = db.executed
+    sql = " ".join(str(compiled).split())
+    # A linha repetida fica só com a última ocorrência
+    assert [compiled.params[f"spend_m{i}"] for i in range(2)] == [2.0, 10.5]
+    assert "spend_m2" not in compiled.params
+    assert "ON CONFLICT (campaign_id, date_start) DO UPDATE SET" in sql
+    for column in loader.CAMPAIGN_UPDATE_COLUMNS:
+        assert f"campaign.{column} IS DISTINCT FROM excluded.{column}" in sql
+    assert "campaign_id = excluded" not in sql and "date_start = excluded" not in sql
+    assert sql.endswith("RETURNING (xmax = 0) AS inserted")
+
+
+def test_report_counts_inserted_updated_and_unchanged_per_chunk():
+    # 1º bloco: uma nova e uma atualizada; 2º bloco: uma nova, a outra inalterada (não volta no RETURNING)
+    db = FakeDB(returned=[[True, False], [True]])
+    rows = [campaign_row("1", day) for day in range(1, 5)]
+
+    report = loader.upsert_campaigns(db, rows, chunk_size=2)
+
+    assert len(db.executed) == 2
+    assert report == {"inserted": 2, "updated": 1, "unchanged": 1}
+
+
+def test_empty_load_executes_nothing():
+    db = FakeDB()
+    assert loader.upsert_campaigns(db, []) == {"inserted": 0, "updated": 0, "unchanged": 0}
+    assert db.executed == []
+
+
+def test_actions_missing_from_reloaded_days_are_deleted_before_the_upsert():
+    db = FakeDB()
+    actions = pd.DataFrame({
+        "campaign_id": ["1", "1"], "date_start": [date(2025, 3, 1)] * 2,
+        "metric": pd.Categorical(["conversions", "conversion_values"]),
+        "action_type": pd.Categorical(["purchase", "purchase"]), "value": [3.0, 149.7],
+    })
+
+    # 02/03 foi recarregado e ficou sem nenhuma ação
+    loader.upsert_campaign_actions(db, actions, reloaded=[("1", date(2025, 3, 1)), ("1", date(2025, 3, 2))])
+
+    delete_stmt, insert_stmt = (" ".join(str(compiled).split()) for compiled in db.executed)
+    assert delete_stmt.startswith("DELETE FROM campaign_action WHERE (campaign_action.campaign_id, "
+                                  "campaign_action.date_start) IN")
+    assert ("(campaign_action.campaign_id, campaign_action.date_start, campaign_action.metric, "
+            "campaign_action.action_type) NOT IN") in delete_stmt
+    params = db.executed[0].construct_params()
+    pairs = next(value for name, value in params.items() if len(value[0]) == 2)
+    kept = next(value for name, value in params.items() if len(value[0]) == 4)
+    assert set(pairs) == {("1", date(2025, 3, 1)), ("1", date(2025, 3, 2))}
+    assert set(kept) == {("1", date(2025, 3, 1), "conversions", "purchase"),
+                         ("1", date(2025, 3, 1), "conversion_values", "purchase")}
+    assert insert_stmt.startswith("INSERT INTO campaign_action")
+
+
+def test_reloaded_days_default_to_the_days_in_the_frame():
+    db = FakeDB()
+    actions = pd.DataFrame({"campaign_id": ["1"], "date_start": [date(2025, 3, 1)], "metric": ["conversions"],
+                            "action_type": ["purchase"], "value": [3.0]})
+
+    loader.upsert_campaign_actions(db, actions)
+
+    params = db.executed[0].construct_params()
+    assert [("1", date(2025, 3, 1))] in params.values()
+
+
+def test_delete_is_limited_to_the_requested_metrics():
+    db = FakeDB()
+    # Carga com as métricas padrão; `actions` foi gravada antes por outra configuração
+    actions = pd.DataFrame({"campaign_id": ["1"], "date_start": [date(2025, 3, 1)], "metric": ["conversions"],
+                            "action_type": ["purchase"], "value": [3.0]})
+
+    loader.upsert_campaign_actions(db, actions, reloaded=[("1", date(2025, 3, 1))],
+                                   metrics=("conversions", "conversion_values"))
+
+    delete_stmt = " ".join(str(db.executed[0]).split())
+    assert "campaign_action.metric IN" in delete_stmt
+    params = db.executed[0].construct_params()
+    assert ["conversion_values", "conversions"] in params.values()
+    assert not any("actions" in value for value in params.values() if isinstance(value, list))
+
+
+def test_empty_frame_without_metrics_deletes_nothing():
+    db = FakeDB()
+    actions = pd.DataFrame(columns=["campaign_id", "date_start", "metric", "action_type", "value"])
+
+    assert loader.upsert_campaign_actions(db, actions, reloaded=[("1", date(2025, 3, 1))]) == 0
+    assert db.executed == []
@@ -0,0 +1,74 @@
+"""Testes do registro de métricas do pipeline e da exportação para o Prometheus."""
+
+from include.extract import GraphAPI
+from include.metrics import PipelineMetrics, merge_summaries, summary_to_prometheus
+
+from test_extract import FakeSession, make_pages
+
+
+def test_counters_and_timings_are_summarized_per_series():
+    metrics = PipelineMetrics()
+    metrics.incr("rows_loaded_total", 10, table="campaign")
+    metrics.incr("rows_loaded_total", 5, table="campaign")
+    metrics.incr("rows_loaded_total", 2, table="campaign_action")
+    for seconds in (0.1, 0.2, 0.3, 0.4):
+        metrics.observe("db_flush_seconds", seconds, table="campaign")
+    with metrics.timer("stage_seconds", stage="validate"):
+        pass
+
+    summary = metrics.summary()
+    assert summary["counters"] == {
+        'rows_loaded_total{table="campaign"}': 15,
+        'rows_loaded_total{table="campaign_action"}': 2,
+    }
+    flush = summary["timings"]['db_flush_seconds{table="campaign"}']
+    assert flush["count"] == 4
+    assert round(flush["sum"], 6) == 1.0
+    assert (flush["p50"], flush["p99"], flush["max"]) == (0.3, 0.4, 0.4)
+    assert summary["timings"]['stage_seconds{stage="validate"}']["count"] == 1
+
+
+def test_summaries_of_mapped_tasks_are_merged():
+    first, second = PipelineMetrics(), PipelineMetrics()
+    first.incr("rows_loaded_total", 10)
+    second.incr("rows_loaded_total", 7)
+    first.observe("db_commit_seconds", 0.5)
+    second.observe("db_commit_seconds", 0.25)
+    second.observe("db_commit_seconds", 2.0)
+
+    merged = merge_summaries([first.summary(), second.summary()])
+    assert merged["counters"] == {"rows_loaded_total": 17}
+    commit = merged["timings"]["db_commit_seconds"]
+    assert commit["count"] == 3 and commit["sum"] == 2.75 and commit["max"] == 2.0
+
+
+def test_prometheus_text_format():
+    metrics = PipelineMetrics()
+    metrics.incr("requests_total", endpoint="insights", status=200)
+    metrics.observe("request_seconds", 0.05, endpoint="insights")
+
+    text = summary_to_prometheus(metrics.summary(), prefix="test")
+    assert text.splitlines() == [
+        "# TYPE test_requests_total counter",
+        'test_requests_total{endpoint="insights",status="200"} 1',
+        "# TYPE test_request_seconds summary",
+        'test_request_seconds{endpoint="insights",quantile="0.5"} 0.05',
+        'test_request_seconds{endpoint="insights",quantile="0.99"} 0.05',
+        'test_request_seconds_sum{endpoint="insights"} 0.05',
+        'test_request_seconds_count{endpoint="insights"} 1',
+    ]
+
+
+def test_graph_api_records_requests_bytes_and_pages():
+    metrics = PipelineMetrics()
+    api = GraphAPI("TOKEN", session=FakeSession(make_pages(3, 2)), metrics=metrics)
+
+    assert len(api.get_campaigns_status("123")["data"]) == 6
+
+    counters = metrics.summary()["counters"]
+    requests = {key: value for key, value in counters.items() if key.startswith("requests_total")}
+    assert sum(requests.values()) == 3
+    assert all('status="200"' in key for key in requests)
+    assert sum(value for key, value in counters.items() if key.startswith("pages_total")) == 3
+    assert sum(value for key, value in counters.items() if key.startswith("rows_parsed_total")) == 6
+    assert sum(value for key, value in counters.items() if key.startswith("response_bytes_total")) > 0
@@ -0,0 +1,58 @@
+"""Testes da migração do banco (executada em SQLite, a partir da tabela campaign antiga)."""
+
+from sqlalchemy import create_engine, inspect, text
+
+from include.migrate import migrate
+
+# Tabela campaign como era criada antes da carga em lote: sem chave única
+LEGACY_CAMPAIGN = """
+    CREATE TABLE campaign (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, spend FLOAT NOT NULL, cpc FLOAT NOT NULL,
+        cpm FLOAT NOT NULL, objective VARCHAR NOT NULL, clicks INTEGER NOT NULL,
+        campaign_name VARCHAR NOT NULL, campaign_id VARCHAR NOT NULL, frequency FLOAT NOT NULL,
+        date_start DATE NOT NULL, date_stop DATE NOT NULL, created_at DATETIME
+    )
+"""
+
+
+def insert_campaign(connection, campaign, day, spend, created_at):
+    connection.execute(text(
+        "INSERT INTO campaign (spend, cpc, cpm, objective, clicks, campaign_name, campaign_id, frequency, "
+        "date_start, date_stop, created_at) VALUES (:spend, 0.5, 7.1, 'OUTCOME_SALES', 1, 'Campanha', "
+        ":campaign, 1.1, :day, :day, :created_at)"),
+        {"spend": spend, "campaign": campaign, "day": day, "created_at": created_at})
+
+
+def test_legacy_database_is_deduplicated_and_gets_keys_and_new_tables():
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.execute(text(LEGACY_CAMPAIGN))
+        # Mesma campanha e dia gravados a cada minuto pela DAG antiga
+        insert_campaign(connection, "1", "2025-03-01", 1.0, "2025-03-01 10:00:00")
+        insert_campaign(connection, "1", "2025-03-01", 3.0, "2025-03-01 10:02:00")
+        insert_campaign(connection, "1", "2025-03-01", 2.0, "2025-03-01 10:01:00")
+        insert_campaign(connection, "1", "2025-03-02", 5.0, None)
+        insert_campaign(connection, "2", "2025-03-01", 7.0, "2025-03-01 10:00:00")
+
+    assert migrate(engine) == 2
+
+    with engine.connect() as connection:
+        rows = connection.execute(text("SELECT campaign_id, date_start, spend FROM campaign "
+                                       "ORDER BY campaign_id, date_start")).all()
+    assert [tuple(row) for row in rows] == [("1", "2025-03-01", 3.0), ("1", "2025-03-02", 5.0),
+                                            ("2", "2025-03-01", 7.0)]
+    inspector = inspect(engine)
+    unique = [index for index in inspector.get_indexes("campaign") if index["name"] == "uq_campaign_campaign_date"]
+    assert unique[0]["unique"] and unique[0]["column_names"] == ["campaign_id", "date_start"]
+    assert {"extraction_watermark", "campaign_action", "breakdown_value",
+            "campaign_breakdown"} <= set(inspector.get_table_names())
+
+    # Reexecutar não altera nada
+    assert migrate(engine) == 0
+
+
+def test_new_database_is_created_from_the_models():
+    engine = create_engine("sqlite://")
+
+    assert migrate(engine) == 0
+    assert "campaign" in inspect(engine).get_table_names()
@@ -0,0 +1,125 @@
+"""Testes das partições mensais da tabela campaign, sem PostgreSQL."""
+
+import os
+import subprocess
+import sys
+import textwrap
+from contextlib import contextmanager
+from datetime import date
+
+import pytest
+from sqlalchemy.exc import IntegrityError, ProgrammingError
+
+from include import partitions
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+class FakeDB:
+    """Registra os comandos; `existing` são as partições já anexadas e `fail` o erro do próximo CREATE."""
+
+    def __init__(self, existing=(), fail=None):
+        self.existing = list(existing)
+        self.fail = fail
+        self.executed = []
+        self.savepoints = 0
+
+    def execute(self, stmt, params=None):
+        if str(stmt).startswith("SELECT"):
+            return [(name,) for name in self.existing]
+        if self.fail is not None:
+            error, self.fail = self.fail, None
+            raise error
+        self.executed.append(str(stmt))
+
+    @contextmanager
+    def begin_nested(self):
+        self.savepoints += 1
+        yield
+
+
+def test_month_helpers():
+    assert partitions.month_start(date(2025, 3, 17)) == date(2025, 3, 1)
+    assert partitions.next_month(date(2025, 3, 1)) == date(2025, 4, 1)
+    assert partitions.next_month(date(2025, 12, 1)) == date(2026, 1, 1)
+    assert partitions.partition_name(date(2025, 3, 1)) == "campaign_p2025_03"
+
+
+def test_ensure_partitions_covers_every_month_of_the_range():
+    db = FakeDB()
+
+    names = partitions.ensure_partitions(db, date(2025, 11, 20), date(2026, 1, 5))
+
+    assert names == ["campaign_p2025_11", "campaign_p2025_12", "campaign_p2026_01"]
+    assert db.executed == [
+        "CREATE TABLE IF NOT EXISTS campaign_p2025_11 PARTITION OF campaign "
+        "FOR VALUES FROM ('2025-11-01') TO ('2025-12-01')",
+        "CREATE TABLE IF NOT EXISTS campaign_p2025_12 PARTITION OF campaign "
+        "FOR VALUES FROM ('2025-12-01') TO ('2026-01-01')",
+        "CREATE TABLE IF NOT EXISTS campaign_p2026_01 PARTITION OF campaign "
+        "FOR VALUES FROM ('2026-01-01') TO ('2026-02-01')",
+    ]
+
+
+class PgError(Exception):
+    def __init__(self, pgcode):
+        self.pgcode = pgcode
+
+
+def test_existing_partitions_are_not_created_again():
+    db = FakeDB(existing=["campaign_p2025_03"])
+
+    names = partitions.ensure_partitions(db, date(2025, 3, 5), date(2025, 4, 2))
+
+    assert names == ["campaign_p2025_03", "campaign_p2025_04"]
+    assert [stmt.split()[5] for stmt in db.executed] == ["campaign_p2025_04"]
+    assert db.savepoints == 1
+
+
+def test_partition_created_concurrently_is_ignored():
+    # Outra task criou a partição entre a consulta e o CREATE
+    db = FakeDB(fail=IntegrityError("CREATE", {}, PgError("23505")))
+    assert partitions.ensure_partitions(db, date(2025, 3, 1), date(2025, 3, 31)) == ["campaign_p2025_03"]
+
+    db = FakeDB(fail=ProgrammingError("CREATE", {}, PgError("42P07")))
+    assert partitions.ensure_partitions(db, date(2025, 3, 1), date(2025, 3, 31)) == ["campaign_p2025_03"]
+
+    db = FakeDB(fail=ProgrammingError("CREATE", {}, PgError("42501")))  # sem permissão
+    with pytest.raises(ProgrammingError):
+        partitions.ensure_partitions(db, date(2025, 3, 1), date(2025, 3, 31))
+
+
+def test_only_months_entirely_before_the_cutoff_are_detached():
+    db = FakeDB(existing=["campaign_default", "campaign_p2025_01", "campaign_p2025_02", "campaign_p2025_03"])
+
+    # 01/03 mantém março; fevereiro termina antes do corte
+    detached = partitions.detach_partitions_before(db, date(2025, 3, 1), drop=True)
+
+    assert detached == ["campaign_p2025_01", "campaign_p2025_02"]
+    assert db.executed == [
+        "ALTER TABLE campaign DETACH PARTITION campaign_p2025_01", "DROP TABLE campaign_p2025_01",
+        "ALTER TABLE campaign DETACH PARTITION campaign_p2025_02", "DROP TABLE campaign_p2025_02",
+    ]
+    # No meio do mês, o mês do corte continua anexado
+    assert partitions.detach_partitions_before(db, date(2025, 2, 15)) == ["campaign_p2025_01"]
+
+
+def test_partitioned_campaign_ddl():
+    # CAMPAIGN_PARTITIONED é lido na importação de include.models: compila em um processo novo
+    code = """
+        from sqlalchemy.dialects import postgresql
+        from sqlalchemy.schema import CreateTable
+        from include.models import Campaign
+
+        print(CreateTable(Campaign.__table__).compile(dialect=postgresql.dialect()))
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", textwrap.dedent(code)], cwd=ROOT, capture_output=True, text=True,
+        timeout=120, env={**os.environ, "CAMPAIGN_PARTITIONED": "true", "URLPOSTGRES": "sqlite://"},
+    )
+    assert result.returncode == 0, result.stderr
+    ddl = " ".join(result.stdout.split())
+
+    assert "PRIMARY KEY (id, date_start)" in ddl
+    assert ddl.endswith("PARTITION BY RANGE (date_start)")
+    assert "UNIQUE (campaign_id, date_start)" in ddl
@@ -0,0 +1,59 @@
+"""Testes do dataset Parquet particionado por conta e data."""
+
+from datetime import date
+
+import pandas as pd
+import pyarrow.dataset as ds
+
+from include.sink import read_parquet, write_parquet
+
+
+def make_frame(spend, days=(1, 2)):
+    return pd.DataFrame([
+        {"spend": spend, "cpc": 0.5, "cpm": 7.0, "objective": "OUTCOME_SALES", "clicks": 3,
+         "campaign_name": f"Campanha {c}", "campaign_id": str(c), "frequency": 1.1,
+         "date_start": f"2025-03-{d:02d}", "date_stop": f"2025-03-{d:02d}",
+         "conversions": [{"value": "1"}]}  # coluna fora do schema, descartada
+        for c in (1, 2) for d in days
+    ])
+
+
+def test_partitions_by_account_and_date(tmp_path):
+    write_parquet(make_frame(1.0), str(tmp_path), "111")
+
+    partitions = sorted(p.relative_to(tmp_path).as_posix() for p in tmp_path.glob("*/*"))
+    assert partitions == ["account_id=111/date_start=2025-03-01", "account_id=111/date_start=2025-03-02"]
+
+    df = read_parquet(str(tmp_path), columns=["campaign_id", "spend"],
+                      filter=ds.field("date_start") == date(2025, 3, 2))
+    assert list(df.columns) == ["campaign_id", "spend"]
+    assert len(df) == 2 and str(df["spend"].dtype) == "float32"
+
+
+def test_append_and_overwrite_partition_modes(tmp_path):
+    write_parquet(make_frame(1.0), str(tmp_path), "111")
+    write_parquet(make_frame(1.0, days=(2,)), str(tmp_path), "111", mode="append")
+    assert len(read_parquet(str(tmp_path))) == 6
+
+    # Só a partição do dia 2 é substituída; o dia 1 continua igual
+    write_parquet(make_frame(9.0, days=(2,)), str(tmp_path), "111", mode="overwrite")
+    df = read_parquet(str(tmp_path))
+    assert len(df) == 4
+    assert df.groupby("date_start")["spend"].max().tolist() == [1.0, 9.0]
+
+
+def test_merge_keeps_rows_of_campaigns_missing_from_the_new_frame(tmp_path):
+    write_parquet(make_frame(1.0), str(tmp_path), "111")
+    write_parquet(make_frame(1.0), str(tmp_path), "222")
+
+    # Nova coleta só da campanha 1 (a 2 falhou), com um dia novo
+    partial = make_frame(9.0, days=(2, 3))
+    write_parquet(partial[partial["campaign_id"] == "1"], str(tmp_path), "111", mode="merge")
+
+    df = read_parquet(str(tmp_path))
+    spend = {(row.account_id, row.campaign_id, row.date_start.day): row.spend for row in df.itertuples()}
+    assert spend == {
+        ("111", "1", 1): 1.0, ("111", "1", 2): 9.0, ("111", "1", 3): 9.0,
+        ("111", "2", 1): 1.0, ("111", "2", 2): 1.0,
+        ("222", "1", 1): 1.0, ("222", "1", 2): 1.0, ("222", "2", 1): 1.0, ("222", "2", 2): 1.0,
+    }
@@ -0,0 +1,44 @@
+"""Testes do gravador de snapshots NDJSON."""
+
+import gzip
+import json
+
+import pytest
+
+from include.snapshot import NDJSONSnapshotWriter
+
+
+def pages():
+    yield [{"id": "1", "name": "Campanha ç"}, {"id": "2", "name": "B"}]
+    yield [{"id": "3", "name": "C"}]
+
+
+def test_writes_pages_and_renames_on_success(tmp_path):
+    path = str(tmp_path / "raw" / "campaigns.ndjson.gz")
+
+    with NDJSONSnapshotWriter(path, compression="gzip") as writer:
+        for page in pages():
+            writer.write_page(page)
+
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    assert [row["id"] for row in rows] == ["1", "2", "3"]
+    assert rows[0]["name"] == "Campanha ç"
+    assert not (tmp_path / "raw" / "campaigns.ndjson.gz.partial").exists()
+
+
+def test_crash_leaves_valid_partial_file(tmp_path):
+    path = str(tmp_path / "campaigns.ndjson.gz")
+
+    def failing_pages():
+        yield from pages()
+        raise RuntimeError("conexão perdida")
+
+    with pytest.raises(RuntimeError):
+        with NDJSONSnapshotWriter(path, compression="gzip") as writer:
+            for page in failing_pages():
+                writer.write_page(page)
+
+    assert not (tmp_path / "campaigns.ndjson.gz").exists()
+    with gzip.open(path + ".partial", "rt", encoding="utf-8") as f:
+        assert len(f.readlines()) == 3
@@ -0,0 +1,78 @@
+"""Testes do RateLimitThrottler a partir dos cabeçalhos de uso da Graph API."""
+
+import json
+
+from include.throttle import RateLimitThrottler
+
+
+def test_no_delay_below_threshold():
+    throttler = RateLimitThrottler(threshold=75, max_delay=60)
+    throttler.update({"X-App-Usage": json.dumps({"call_count": 40, "total_time": 10, "total_cputime": 5})})
+
+    assert throttler.current_usage() == 40
+    assert throttler.delay() == 0
+
+
+def test_delay_grows_with_highest_usage_header():
+    throttler = RateLimitThrottler(threshold=50, max_delay=60)
+    throttler.update({
+        "X-App-Usage": json.dumps({"call_count": 10}),
+        "X-Ad-Account-Usage": json.dumps({"acc_id_util_pct": 75}),
+    })
+    medium = throttler.delay()
+
+    throttler.update({"X-Ad-Account-Usage": json.dumps({"acc_id_util_pct": 100})})
+
+    assert 0 < medium < throttler.delay() == 60
+
+
+def test_regain_access_blocks_until_deadline():
+    throttler = RateLimitThrottler()
+    header = {"123": [{"type": "ads_insights", "call_count": 100,
+                       "estimated_time_to_regain_access": 2}]}
+    throttler.update({"X-Business-Use-Case-Usage": json.dumps(header)})
+
+    assert 110 < throttler.delay() <= 120
+
+
+def test_shared_per_token_and_ignores_invalid_headers():
+    assert RateLimitThrottler.for_token("a") is RateLimitThrottler.for_token("a")
+    assert RateLimitThrottler.for_token("a") is not RateLimitThrottler.for_token("b")
+
+    throttler = RateLimitThrottler()
+    throttler.update({"X-App-Usage": "not json"})
+    assert throttler.delay() == 0
+
+
+def test_account_usage_and_block_do_not_slow_other_accounts():
+    throttler = RateLimitThrottler(threshold=75, max_delay=60)
+    throttler.update({
+        "X-App-Usage": json.dumps({"call_count": 20}),
+        "X-Ad-Account-Usage": json.dumps({"acc_id_util_pct": 99}),
+        "X-Business-Use-Case-Usage": json.dumps(
+            {"999": [{"type": "ads_insights", "call_count": 100, "estimated_time_to_regain_access": 15}]}),
+    }, account="act_111")
+
+    assert throttler.delay("act_111") > 800
+    assert throttler.delay("act_222") == 0
+    assert throttler.current_usage("act_222") == 20
+
+    # O uso global do app continua valendo para todas as contas
+    throttler.update({"X-App-Usage": json.dumps({"call_count": 100})}, account="act_222")
+    assert throttler.delay("act_222") == 60
+
+
+def test_account_usage_is_replaced_by_next_response_and_expires():
+    throttler = RateLimitThrottler(threshold=75, max_delay=60, usage_ttl=300)
+    throttler.update({"X-Ad-Account-Usage": json.dumps({"acc_id_util_pct": 99})}, account="act_111")
+    assert throttler.delay("act_111") > 0
+
+    # A resposta seguinte da conta já não traz uso alto
+    throttler.update({"X-Ad-Account-Usage": json.dumps({"acc_id_util_pct": 10})}, account="act_111")
+    assert throttler.delay("act_111") == 0
+
+    # Medição antiga (conta que já terminou) deixa de contar após o TTL
+    throttler.update({"X-Ad-Account-Usage": json.dumps({"acc_id_util_pct": 99})}, account="act_111")
+    usage, blocked, updated = throttler._accounts["act_111"]
+    throttler._accounts["act_111"] = (usage, blocked, updated - 301)
+    assert throttler.delay("act_111") == 0
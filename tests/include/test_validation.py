@@ -0,0 +1,39 @@
+"""Testes da validação em lote e da quarentena de linhas inválidas."""
+
+import json
+from datetime import date
+
+from include.validation import validate_rows, write_quarantine
+
+
+def api_row(**overrides):
+    row = {"spend": "12.50", "cpc": "0.42", "cpm": "7.10", "clicks": "30", "frequency": "1.07",
+           "objective": "OUTCOME_SALES", "campaign_name": "Campanha", "campaign_id": "10",
+           "date_start": "2025-03-01", "date_stop": "2025-03-01", "actions": []}
+    row.update(overrides)
+    return row
+
+
+def test_valid_page_is_coerced_without_extra_fields():
+    rows, rejects = validate_rows([api_row(), api_row(campaign_id="11")])
+    assert rejects == []
+    assert rows[0]["spend"] == 12.5 and rows[0]["clicks"] == 30
+    assert rows[0]["date_start"] == date(2025, 3, 1)
+    assert "actions" not in rows[0]
+
+
+def test_invalid_rows_are_quarantined_instead_of_raising(tmp_path):
+    bad_clicks = api_row(clicks="abc")
+    missing_spend = api_row()
+    del missing_spend["spend"]
+
+    rows, rejects = validate_rows([api_row(), bad_clicks, missing_spend, api_row()])
+    assert len(rows) == 2
+    assert [r["row"] for r in rejects] == [bad_clicks, missing_spend]
+    assert rejects[0]["errors"][0]["field"] == "clicks"
+    assert rejects[1]["errors"][0]["type"] == "missing"
+
+    path = write_quarantine(rejects, "campaign 123", directory=str(tmp_path))
+    with open(path, encoding="utf-8") as f:
+        assert [json.loads(line)["row"] for line in f] == [bad_clicks, missing_spend]
+    assert write_quarantine([], "campaign 123", directory=str(tmp_path)) is None
@@ -0,0 +1,19 @@
+"""Testes do cálculo do intervalo de extração incremental."""
+
+from datetime import date
+
+from include.watermark import extraction_range
+
+
+def test_new_campaign_uses_lookback_window():
+    assert extraction_range(None, today=date(2025, 3, 31), lookback_days=30) == (
+        date(2025, 3, 1), date(2025, 3, 31))
+
+
+def test_known_campaign_only_fetches_new_days_plus_restatement():
+    since, until = extraction_range(date(2025, 3, 30), today=date(2025, 3, 31), restatement_days=3)
+    assert (since, until) == (date(2025, 3, 27), date(2025, 3, 31))
+
+    # watermark muito antigo não passa da janela máxima
+    since, _ = extraction_range(date(2024, 1, 1), today=date(2025, 3, 31), lookback_days=30)
+    assert since == date(2025, 3, 1)